@@ -2,6 +2,25 @@ import type { IQuizAPI, QuizCreateDTO, QuizCreatedResponse } from "./IQuizAPI";
 
 const BASE_URL = import.meta.env.VITE_API_URL;
 
+// liste kvizova su paginirane, sljedeca strana se trazi preko X-Next-Cursor
+async function fetchAllPages(url: string, init: RequestInit, errorMessage: string): Promise<any[]> {
+  const items: any[] = [];
+  let cursor: string | null = null;
+
+  do {
+    const pageUrl: string = cursor ? `${url}?cursor=${encodeURIComponent(cursor)}` : url;
+    const response = await fetch(pageUrl, init);
+    if (!response.ok) {
+      const errText = await response.text();
+      throw new Error(`${errorMessage} (${response.status}): ${errText}`);
+    }
+    items.push(...(await response.json()));
+    cursor = response.headers.get("X-Next-Cursor");
+  } while (cursor);
+
+  return items;
+}
+
 export class QuizAPI implements IQuizAPI {
   async createQuiz(data: QuizCreateDTO): Promise<QuizCreatedResponse> {
     const QUIZ_SERVICE_URL = "http://localhost:5001/api/quizzes";
@@ -35,14 +54,9 @@ export class QuizAPI implements IQuizAPI {
 
   async getAllQuizzes(): Promise<any[]> {
     const token = localStorage.getItem("access_token");
-    const response = await fetch(`${BASE_URL}/quizzes/`, {
+    return fetchAllPages(`${BASE_URL}/quizzes/`, {
       headers: { Authorization: token ? `Bearer ${token}` : "" },
-    });
-    if (!response.ok) {
-      const errText = await response.text();
-      throw new Error(`Failed to fetch quizzes (${response.status}): ${errText}`);
-    }
-    return await response.json();
+    }, "Failed to fetch quizzes");
   }
 
   async reviewQuiz(
@@ -67,14 +81,9 @@ export class QuizAPI implements IQuizAPI {
   }
 
   async getApprovedQuizzes(): Promise<any[]> {
-    const response = await fetch(`http://localhost:5001/api/quizzes/published`, {
+    return fetchAllPages(`http://localhost:5001/api/quizzes/published`, {
       headers: { "Content-Type": "application/json" },
-    });
-    if (!response.ok) {
-      const text = await response.text();
-      throw new Error(`Failed to load quizzes (${response.status}): ${text}`);
-    }
-    return response.json();
+    }, "Failed to load quizzes");
   }
 
   async deleteQuiz(quizId: string): Promise<void> {
@@ -8,6 +8,7 @@ interface QuizReportItem {
   status: string;
   duration: number;
   questions?: any[];      
+  question_count?: number;
   created_at?: string;
 }
 interface Props {
@@ -41,7 +42,7 @@ const formatDate = (dateString?: string) => {
       q.title,
       q.author_id,
       q.status,
-      q.questions?.length || 0,
+      q.question_count ?? q.questions?.length ?? 0,
       q.duration + "s",
       formatDate(q.created_at),
     ]);
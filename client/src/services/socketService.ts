@@ -7,7 +7,12 @@ class SocketService {
 
   connect() {
     if (!this.socket) {
-      this.socket = io(SOCKET_URL, { transports: ["polling"], withCredentials: false });
+      const token = localStorage.getItem("access_token");
+      this.socket = io(SOCKET_URL, {
+        transports: ["polling"],
+        withCredentials: false,
+        auth: token ? { token } : undefined,
+      });
     }
     return this.socket;
   }
@@ -17,6 +22,11 @@ class SocketService {
     this.socket!.on("new_quiz_created", callback);
   }
 
+  onQuizGraded(callback: (data: any) => void) {
+    if (!this.socket) this.connect();
+    this.socket!.on("quiz_graded", callback);
+  }
+
   disconnect() {
     if (this.socket) {
       this.socket.disconnect();
@@ -15,3 +15,30 @@ class MongoDatabase:
 
 db_mongo = MongoDatabase()
 
+
+class AsyncMongoDatabase:
+    """
+    Motor klijent za async servis. Klijent se pravi pri prvom pristupu,
+    unutar event loop-a koji ga koristi.
+    """
+
+    def __init__(self):
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            self._client = AsyncIOMotorClient(os.getenv("MONGO_URI", "mongodb://mongo_db:27017/"))
+        return self._client
+
+    def get_collection(self, name):
+        return self.client[os.getenv("DB_NAME", "quiz_db")][name]
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+async_db_mongo = AsyncMongoDatabase()
+
@@ -0,0 +1,69 @@
+from pymongo import ASCENDING
+from bson import ObjectId
+
+#indeksi kolekcije quizzes, primjenjuju se idempotentno pri startu servisa
+QUIZ_INDEXES = [
+    #keyset paginacija objavljenih kvizova filtrira po statusu i sortira po _id
+    {"name": "status_id", "keys": [("status", ASCENDING), ("_id", ASCENDING)]},
+]
+
+#indeksi iz ranijih verzija koje nijedna ruta ne koristi, brisu se pri startu
+OBSOLETE_QUIZ_INDEXES = ["status_created_at", "author_id_created_at", "title_text"]
+
+#bitseti predaja za analizu pitanja: isti posao se ne upisuje dva puta, rebuild cita po kvizu
+OUTCOME_INDEXES = [
+    {"name": "job_id_unique", "keys": [("job_id", ASCENDING)], "unique": True,
+     "partialFilterExpression": {"job_id": {"$type": "string"}}},
+    {"name": "quiz_id_layout", "keys": [("quiz_id", ASCENDING), ("layout", ASCENDING)]},
+]
+
+#upiti koje rute salju MongoDB-u, za provjeru plana izvrsavanja
+#($match i $sort na pocetku agregacije planiraju se isto kao find + sort)
+ROUTE_QUERIES = {
+    "GET / (list page / NDJSON export)": lambda c: c.find({"_id": {"$gt": ObjectId()}}).sort("_id", ASCENDING).limit(100),
+    "GET /published (page / cache rebuild)": lambda c: c.find({"status": "APPROVED"}).sort("_id", ASCENDING).limit(100),
+    "PATCH /<quiz_id>/status (cache upsert)": lambda c: c.find({"_id": ObjectId(), "status": "APPROVED"}).sort("_id", ASCENDING),
+    "GET|PATCH|DELETE /<quiz_id>, answer key": lambda c: c.find({"_id": ObjectId()}),
+}
+
+
+def ensure_indexes(collection, specs=QUIZ_INDEXES, obsolete=()) -> list:
+    existing = collection.index_information()
+    for name in obsolete:
+        if name in existing:
+            collection.drop_index(name)
+
+    created = []
+    for spec in specs:
+        options = {k: v for k, v in spec.items() if k not in ("keys", "name")}
+        created.append(collection.create_index(spec["keys"], name=spec["name"], **options))
+    return created
+
+
+def _stages(plan: dict) -> list:
+    stages = [plan.get("stage")]
+    if "inputStage" in plan:
+        stages += _stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        stages += _stages(child)
+    return stages
+
+
+def explain_route_queries(collection) -> list:
+    """
+    Pokrece explain() za upit svake rute i oznacava one koji rade COLLSCAN.
+    """
+    report = []
+    for route, build_query in ROUTE_QUERIES.items():
+        try:
+            plan = build_query(collection).explain()["queryPlanner"]["winningPlan"]
+            plan = plan.get("queryPlan", plan)
+            stages = _stages(plan)
+            report.append({
+                "route": route,
+                "stages": stages,
+                "collection_scan": "COLLSCAN" in stages
+            })
+        except Exception as e:
+            report.append({"route": route, "error": str(e)})
+    return report
@@ -17,6 +17,35 @@ class QuizDTO:
     status: str = "PENDING"
     rejection_reason: Optional[str] = None
 
+    @staticmethod
+    def from_request(data: dict) -> "QuizDTO":
+        #front salje pitanja u vise formata (text/question, correct_answers/answer)
+        questions = []
+        for q in data.get("questions", []):
+            text = q.get("text") or q.get("question") or ""
+
+            if "correct_answers" in q:
+                correct_answers = q.get("correct_answers") or []
+            else:
+                ans = q.get("answer")
+                correct_answers = [str(ans)] if ans is not None else []
+
+            questions.append(
+                QuestionDTO(
+                    text=text,
+                    options=q.get("options", []),
+                    correct_answers=correct_answers,
+                    points=q.get("points", 1),
+                )
+            )
+
+        return QuizDTO(
+            title=data.get("title") or data.get("name") or "Untitled quiz",
+            author_id=data.get("author_id") or data.get("authorId") or 0,
+            duration=data.get("duration") or data.get("time_limit") or 60,
+            questions=questions,
+        )
+
     def to_disc(self):
         #DTO u format koji razumije MongoDB
         return asdict(self)
\ No newline at end of file
@@ -0,0 +1,263 @@
+import os
+import copy
+import json
+import uuid
+import queue
+import socket
+import multiprocessing
+import redis
+
+
+class RedisJobQueue:
+    """
+    Trajni red poslova nad Redis listom.
+    Posao se pri preuzimanju atomicno prebacuje u listu "processing" workera
+    (host:pid instance i redni broj workera) i brise se iz nje tek nakon
+    ack-a. Instanca drzi heartbeat kljuc sa TTL-om; poslovi iz listi instance
+    ciji je heartbeat istekao vracaju se u red, a liste zivih instanci se ne
+    diraju. Listu workera koji je pao vraca sama instanca (requeue_worker).
+    """
+
+    STATUS_TTL = 24 * 3600
+
+    def __init__(self, name: str = "grading", instance_id: str | None = None):
+        self.host = os.getenv("REDIS_HOST", "redis_cache")
+        self.port = int(os.getenv("REDIS_PORT", 6379))
+        self.heartbeat_ttl = int(os.getenv("GRADING_HEARTBEAT_TTL", 30))
+        self.instance_id = instance_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.pending_key = f"{name}:jobs"
+        self.processing_prefix = f"{name}:processing:"
+        self.processing_key = self.processing_prefix + self.instance_id
+        self.alive_prefix = f"{name}:alive:"
+        self.instances_key = f"{name}:instances"
+        #zajednicka lista iz verzije prije listi po instanci
+        self.legacy_processing_key = f"{name}:processing"
+        self.status_prefix = f"{name}:status:"
+        self._client = None
+
+    # redis konekcija se ne moze pickle-ovati, svaki proces otvara svoju
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_client"] = None
+        return state
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = redis.Redis(host=self.host, port=self.port, db=0, decode_responses=True)
+        return self._client
+
+    def ping(self) -> bool:
+        return bool(self.client.ping())
+
+    def worker_key(self, slot: int) -> str:
+        return f"{self.processing_prefix}{self.instance_id}:{slot}"
+
+    def for_worker(self, slot: int):
+        #kopija reda koju koristi jedan worker proces, sa svojom listom "processing"
+        worker_queue = copy.copy(self)
+        worker_queue._client = None
+        worker_queue.processing_key = self.worker_key(slot)
+        return worker_queue
+
+    def requeue_worker(self, slot: int) -> int:
+        return self._requeue(self.worker_key(slot))
+
+    def push(self, job: dict) -> None:
+        self.client.lpush(self.pending_key, json.dumps(job))
+
+    def pop(self, timeout: int = 5):
+        raw = self.client.blmove(self.pending_key, self.processing_key, timeout, "RIGHT", "LEFT")
+        if raw is None:
+            return None
+        job = json.loads(raw)
+        job["_raw"] = raw
+        return job
+
+    def pop_nowait(self):
+        raw = self.client.lmove(self.pending_key, self.processing_key, "RIGHT", "LEFT")
+        if raw is None:
+            return None
+        job = json.loads(raw)
+        job["_raw"] = raw
+        return job
+
+    def ack(self, job: dict) -> None:
+        raw = job.get("_raw")
+        if raw is not None:
+            self.client.lrem(self.processing_key, 1, raw)
+
+    def heartbeat(self) -> None:
+        pipe = self.client.pipeline()
+        pipe.sadd(self.instances_key, self.instance_id)
+        pipe.set(self.alive_prefix + self.instance_id, 1, ex=self.heartbeat_ttl)
+        pipe.execute()
+
+    def release(self) -> None:
+        #pri gasenju heartbeat odmah nestaje, pa druge instance preuzimaju nedovrsene poslove
+        self.client.delete(self.alive_prefix + self.instance_id)
+
+    def _requeue(self, processing_key: str) -> int:
+        #LMOVE je atomican, pa posao preuzme samo jedna instanca i kad dvije oporavljaju istu listu
+        moved = 0
+        while self.client.lmove(processing_key, self.pending_key, "LEFT", "RIGHT"):
+            moved += 1
+        return moved
+
+    def _requeue_instance(self, instance_id: str) -> int:
+        moved = self._requeue(self.processing_prefix + instance_id)
+        for key in self.client.scan_iter(match=f"{self.processing_prefix}{instance_id}:*"):
+            moved += self._requeue(key)
+        return moved
+
+    def recover(self) -> int:
+        """
+        Vraca na pocetak reda poslove iz lista instanci koje vise nisu zive
+        (heartbeat je istekao). Ova instanca i druge zive instance se preskacu.
+        """
+        moved = self._requeue(self.legacy_processing_key)
+
+        instances = [i for i in self.client.smembers(self.instances_key) if i != self.instance_id]
+        if not instances:
+            return moved
+
+        pipe = self.client.pipeline(transaction=False)
+        for instance_id in instances:
+            pipe.exists(self.alive_prefix + instance_id)
+        alive = pipe.execute()
+
+        for instance_id, is_alive in zip(instances, alive):
+            if is_alive:
+                continue
+            moved += self._requeue_instance(instance_id)
+            self.client.srem(self.instances_key, instance_id)
+        return moved
+
+    def set_status(self, job_id: str, fields: dict) -> None:
+        key = self.status_prefix + job_id
+        pipe = self.client.pipeline()
+        pipe.hset(key, mapping={k: json.dumps(v) for k, v in fields.items()})
+        pipe.expire(key, self.STATUS_TTL)
+        pipe.execute()
+
+    def get_status(self, job_id: str):
+        record = self.client.hgetall(self.status_prefix + job_id)
+        if not record:
+            return None
+        return {k: json.loads(v) for k, v in record.items()}
+
+
+class AsyncRedisJobQueue:
+    """
+    Async (redis.asyncio) strana RedisJobQueue-a za async servis: isti kljucevi
+    i format, pa poslove preuzimaju postojeci grading workeri.
+    """
+
+    STATUS_TTL = RedisJobQueue.STATUS_TTL
+
+    def __init__(self, name: str = "grading"):
+        import redis.asyncio as aioredis
+
+        self.pending_key = f"{name}:jobs"
+        self.status_prefix = f"{name}:status:"
+        self.client = aioredis.Redis(
+            host=os.getenv("REDIS_HOST", "redis_cache"),
+            port=int(os.getenv("REDIS_PORT", 6379)),
+            db=0,
+            decode_responses=True
+        )
+
+    async def push(self, job: dict) -> None:
+        await self.client.lpush(self.pending_key, json.dumps(job))
+
+    async def set_status(self, job_id: str, fields: dict) -> None:
+        key = self.status_prefix + job_id
+        async with self.client.pipeline() as pipe:
+            pipe.hset(key, mapping={k: json.dumps(v) for k, v in fields.items()})
+            pipe.expire(key, self.STATUS_TTL)
+            await pipe.execute()
+
+    async def get_status(self, job_id: str):
+        record = await self.client.hgetall(self.status_prefix + job_id)
+        if not record:
+            return None
+        return {k: json.loads(v) for k, v in record.items()}
+
+
+class InMemoryJobQueue:
+    """
+    Red poslova u memoriji (za testove i rad bez Redisa).
+    Poslovi ne prezivljavaju restart.
+    """
+
+    def __init__(self, ctx=None):
+        ctx = ctx or multiprocessing.get_context("spawn")
+        self._queue = ctx.Queue()
+        self._manager = ctx.Manager()
+        self._statuses = self._manager.dict()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_manager"] = None
+        return state
+
+    def ping(self) -> bool:
+        return True
+
+    def push(self, job: dict) -> None:
+        self._queue.put(job)
+
+    def pop(self, timeout: int = 5):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def pop_nowait(self):
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def ack(self, job: dict) -> None:
+        pass
+
+    def for_worker(self, slot: int):
+        return self
+
+    def requeue_worker(self, slot: int) -> int:
+        #poslovi iz memorije ne prezivljavaju ni pad workera
+        return 0
+
+    def heartbeat(self) -> None:
+        pass
+
+    def release(self) -> None:
+        pass
+
+    def recover(self) -> int:
+        return 0
+
+    def set_status(self, job_id: str, fields: dict) -> None:
+        record = dict(self._statuses.get(job_id, {}))
+        record.update(fields)
+        self._statuses[job_id] = record
+
+    def get_status(self, job_id: str):
+        record = self._statuses.get(job_id)
+        return dict(record) if record else None
+
+
+def create_job_queue(name: str = "grading", ctx=None):
+    backend = os.getenv("GRADING_QUEUE_BACKEND", "redis").lower()
+
+    if backend == "memory":
+        return InMemoryJobQueue(ctx)
+
+    job_queue = RedisJobQueue(name)
+    try:
+        job_queue.ping()
+        return job_queue
+    except Exception as e:
+        print(f"Redis job queue unavailable, using in-memory queue: {e}")
+        return InMemoryJobQueue(ctx)
@@ -0,0 +1,43 @@
+import json
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps_bytes(obj) -> bytes:
+    """
+    Serijalizuje objekat u JSON bajtove, preko orjson-a ako je instaliran.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=FastJSONProvider.default,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+    return json.dumps(obj, default=FastJSONProvider.default, sort_keys=True).encode("utf-8")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider koji koristi orjson kada je dostupan, a inace standardni.
+    Datumi se i dalje formatiraju kao u Flask-ovom DefaultJSONProvider-u.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
@@ -0,0 +1,56 @@
+import os
+import json
+import uuid
+import redis
+import requests
+
+
+class ResultStreamPublisher:
+    """
+    Objavljuje ocijenjene rezultate u Redis stream koji cita glavni server.
+    Svaka poruka nosi idempotency_key, pa ponovljena isporuka ne pravi duplikat.
+    Ako Redis nije dostupan, rezultat se salje direktno preko HTTP-a kao ranije.
+    """
+
+    STREAM = "quiz_results"
+    MAX_LEN = 100000
+
+    def __init__(self):
+        self.host = os.getenv("REDIS_HOST", "redis_cache")
+        self.port = int(os.getenv("REDIS_PORT", 6379))
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = redis.Redis(host=self.host, port=self.port, db=0, decode_responses=True)
+        return self._client
+
+    def publish(self, result: dict) -> str:
+        idempotency_key = result.get("job_id") or uuid.uuid4().hex
+        payload = dict(result, idempotency_key=idempotency_key)
+
+        try:
+            self.client.xadd(
+                self.STREAM,
+                {"idempotency_key": idempotency_key, "payload": json.dumps(payload)},
+                maxlen=self.MAX_LEN,
+                approximate=True
+            )
+            return idempotency_key
+        except Exception as e:
+            print(f"Redis stream unavailable, sending result over HTTP: {e}")
+
+        main_server_url = os.getenv("MAIN_SERVER_URL")
+        internal_token = os.getenv("INTERNAL_API_KEY")
+
+        requests.post(
+            f"{main_server_url}/api/quizzes/internal/results",
+            json=payload,
+            headers={"X-Internal-Token": internal_token},
+            timeout=5
+        )
+        return idempotency_key
+
+
+result_publisher = ResultStreamPublisher()
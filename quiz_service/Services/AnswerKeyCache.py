@@ -0,0 +1,120 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Tuple, FrozenSet
+from bson import ObjectId
+
+
+@dataclass(frozen=True)
+class CompiledAnswerKey:
+    quiz_id: str
+    title: str
+    correct: Tuple[FrozenSet[str], ...] #tacni odgovori po indeksu pitanja
+    options: Tuple[Tuple[str, ...], ...]
+    points: Tuple[int, ...]
+    total_points: int
+    compiled_at: float
+
+    @property
+    def question_count(self) -> int:
+        return len(self.correct)
+
+    @staticmethod
+    def from_quiz(quiz: dict) -> "CompiledAnswerKey":
+        questions = quiz.get("questions", [])
+        points = tuple(int(q.get("points", 0)) for q in questions)
+        return CompiledAnswerKey(
+            quiz_id=str(quiz.get("_id")),
+            title=quiz.get("title", "Kviz"),
+            correct=tuple(
+                frozenset(str(x).strip() for x in q.get("correct_answers", []))
+                for q in questions
+            ),
+            options=tuple(
+                tuple(str(x).strip() for x in q.get("options", []))
+                for q in questions
+            ),
+            points=points,
+            total_points=sum(points),
+            compiled_at=time.time()
+        )
+
+
+class AnswerKeyCache:
+    """
+    Ograniceni LRU kes kompajliranih kljuceva odgovora po kvizu.
+    Svaki proces (web i grading workeri) ima svoju instancu.
+    """
+
+    PROJECTION = {"title": 1, "questions.options": 1, "questions.correct_answers": 1, "questions.points": 1}
+
+    def __init__(self, maxsize: int | None = None):
+        self.maxsize = maxsize or int(os.getenv("ANSWER_KEY_CACHE_SIZE", 256))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._collection = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            from Database.database import db_mongo
+            self._collection = db_mongo.get_collection("quizzes")
+        return self._collection
+
+    def get(self, quiz_id: str, not_before: float = 0.0):
+        """
+        Vraca kljuc iz kesa ili ga kompajlira iz MongoDB. Unos stariji od
+        not_before se smatra zastarjelim (web proces ga je u medjuvremenu
+        ponovo kompajlirao nakon invalidacije).
+        """
+        key = self._lookup(quiz_id, not_before)
+        if key is not None:
+            return key
+
+        quiz = self.collection.find_one({"_id": ObjectId(quiz_id)}, self.PROJECTION)
+        return self._store(quiz_id, quiz)
+
+    async def get_async(self, quiz_id: str, collection, not_before: float = 0.0):
+        """
+        Isto kao get, za async servis: kviz se cita preko Motor kolekcije.
+        """
+        key = self._lookup(quiz_id, not_before)
+        if key is not None:
+            return key
+
+        quiz = await collection.find_one({"_id": ObjectId(quiz_id)}, self.PROJECTION)
+        return self._store(quiz_id, quiz)
+
+    def _lookup(self, quiz_id: str, not_before: float):
+        with self._lock:
+            key = self._entries.get(quiz_id)
+            if key is not None and key.compiled_at >= not_before:
+                self._entries.move_to_end(quiz_id)
+                return key
+        return None
+
+    def _store(self, quiz_id: str, quiz):
+        if not quiz:
+            self.invalidate(quiz_id)
+            return None
+
+        key = CompiledAnswerKey.from_quiz(quiz)
+        with self._lock:
+            self._entries[quiz_id] = key
+            self._entries.move_to_end(quiz_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return key
+
+    def invalidate(self, quiz_id: str) -> None:
+        with self._lock:
+            self._entries.pop(quiz_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+answer_key_cache = AnswerKeyCache()
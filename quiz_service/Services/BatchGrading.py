@@ -0,0 +1,170 @@
+import numpy as np
+from itertools import chain
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+
+@dataclass(frozen=True)
+class KeyMatrix:
+    columns: Tuple[Dict[str, int], ...] #po pitanju: vrijednost opcije -> globalna kolona
+    starts: np.ndarray
+    ends: np.ndarray
+    key: np.ndarray #(opcije,) tacne opcije
+    points: np.ndarray #(pitanja,)
+    codes: Dict[str, int] #vrijednost opcije -> kod, zajednicki za sva pitanja
+    lookup: np.ndarray #(pitanja, kodovi + 1) globalna kolona ili -1; posljednji kod je nepoznata vrijednost
+
+    @property
+    def question_count(self) -> int:
+        return len(self.columns)
+
+    @property
+    def option_count(self) -> int:
+        return len(self.key)
+
+
+def build_key_matrix(answer_key) -> KeyMatrix:
+    """
+    Sve opcije svih pitanja se ravnaju u jedan niz kolona. Tacni odgovori koji
+    nisu medju opcijama dobijaju svoju kolonu, pa je odgovor na pitanje tacan kada
+    je skup izabranih vrijednosti jednak skupu tacnih.
+    """
+    columns = []
+    starts = []
+    ends = []
+    key = []
+
+    for options, correct in zip(answer_key.options, answer_key.correct):
+        values = list(dict.fromkeys(options))
+        values += [c for c in sorted(correct) if c not in values]
+
+        starts.append(len(key))
+        columns.append({v: len(key) + i for i, v in enumerate(values)})
+        key.extend(v in correct for v in values)
+        ends.append(len(key))
+
+    codes = {}
+    for question_columns in columns:
+        for value in question_columns:
+            codes.setdefault(value, len(codes))
+
+    lookup = np.full((len(columns), len(codes) + 1), -1, dtype=np.intp)
+    for q, question_columns in enumerate(columns):
+        for value, col in question_columns.items():
+            lookup[q, codes[value]] = col
+
+    return KeyMatrix(
+        columns=tuple(columns),
+        starts=np.array(starts, dtype=np.intp),
+        ends=np.array(ends, dtype=np.intp),
+        key=np.array(key, dtype=bool),
+        points=np.array(answer_key.points, dtype=np.int64),
+        codes=codes,
+        lookup=lookup
+    )
+
+
+def _question_indices(raw: list, q: int) -> np.ndarray:
+    #indeks koji nije cijeli broj ili je van opsega postaje -1
+    try:
+        indices = np.array(raw)
+    except (TypeError, ValueError):
+        indices = None
+    if indices is None or indices.ndim != 1 or indices.dtype.kind not in "iub":
+        indices = np.fromiter((x if isinstance(x, int) and 0 <= x < q else -1 for x in raw), dtype=np.intp, count=len(raw))
+    return np.where((indices >= 0) & (indices < q), indices, -1).astype(np.intp)
+
+
+def _value_codes(picks: list, codes: dict, unknown: int) -> np.ndarray:
+    #vecina vrijednosti su vec ocisceni stringovi, ostale se porede kao str(x).strip()
+    try:
+        found = list(map(codes.get, chain.from_iterable(picks)))
+    except TypeError:
+        found = None
+
+    if found is None or None in found:
+        values = list(chain.from_iterable(picks))
+        found = found or [None] * len(values)
+        for k in [k for k, code in enumerate(found) if code is None]:
+            found[k] = codes.get(str(values[k]).strip(), unknown)
+    return np.array(found, dtype=np.intp)
+
+
+def build_selection_matrix(key_matrix: KeyMatrix, submissions: list):
+    """
+    Pretvara odgovore u matricu (predaje x opcije). Vraca i masku odgovorenih
+    pitanja i masku pitanja u kojima je izabrana nepostojeca opcija.
+
+    Odgovori svih predaja se ravnaju u jedan niz; iz Python-a se samo citaju
+    polja odgovora, a filtriranje, prvi odgovor po pitanju i kolone opcija
+    (lookup[pitanje, kod vrijednosti]) racuna NumPy.
+    """
+    n = len(submissions)
+    q = key_matrix.question_count
+
+    answers = list(chain.from_iterable(submissions))
+    counts = np.fromiter(map(len, submissions), dtype=np.intp, count=n)
+    rows = np.repeat(np.arange(n, dtype=np.intp), counts)
+    indices = _question_indices([answer.get("question_index") for answer in answers], q)
+    picks = [answer.get("selected") or () for answer in answers]
+    per_answer = np.fromiter(map(len, picks), dtype=np.intp, count=len(picks))
+    unknown = key_matrix.lookup.shape[1] - 1
+    codes = _value_codes(picks, key_matrix.codes, unknown)
+
+    selected = np.zeros((n, key_matrix.option_count), dtype=bool)
+    answered = np.zeros((n, q), dtype=bool)
+    invalid = np.zeros((n, q), dtype=bool)
+
+    #za isto pitanje vazi prvi poslati odgovor; sortiranje samo kad ima ponovljenih
+    kept = np.flatnonzero(indices >= 0)
+    answered[rows[kept], indices[kept]] = True
+    if np.count_nonzero(answered) != len(kept):
+        _, first = np.unique(rows[kept] * q + indices[kept], return_index=True)
+        kept = kept[first]
+
+    is_kept = np.zeros(len(answers), dtype=bool)
+    is_kept[kept] = True
+    value_kept = np.repeat(is_kept, per_answer)
+    value_rows = np.repeat(rows, per_answer)[value_kept]
+    value_questions = np.repeat(indices, per_answer)[value_kept]
+
+    cols = key_matrix.lookup[value_questions, codes[value_kept]]
+    valid = cols >= 0
+
+    selected[value_rows[valid], cols[valid]] = True
+    invalid[value_rows[~valid], value_questions[~valid]] = True
+
+    return selected, answered, invalid
+
+
+def grade_batch(answer_key, submissions: list, key_matrix: KeyMatrix | None = None) -> dict:
+    """
+    Ocjenjuje N predaja istog kviza u jednom vektorizovanom prolazu.
+    """
+    key_matrix = key_matrix or build_key_matrix(answer_key)
+    selected, answered, invalid = build_selection_matrix(key_matrix, submissions)
+
+    #broj razlika po pitanju preko kumulativne sume (radi i za pitanja bez opcija)
+    mismatch = selected != key_matrix.key
+    cumulative = np.zeros((len(submissions), key_matrix.option_count + 1), dtype=np.int32)
+    np.cumsum(mismatch, axis=1, out=cumulative[:, 1:])
+    question_mismatch = cumulative[:, key_matrix.ends] - cumulative[:, key_matrix.starts]
+
+    correct = answered & ~invalid & (question_mismatch == 0)
+    points = correct.astype(np.int64) @ key_matrix.points
+
+    total_points = int(key_matrix.points.sum())
+    if total_points > 0:
+        percentages = points / total_points * 100
+    else:
+        percentages = np.zeros(len(submissions), dtype=float)
+
+    return {
+        "correct": correct,
+        "selected": selected,
+        "answered": answered,
+        "points": points,
+        "percentages": percentages,
+        "question_points": correct * key_matrix.points,
+        "question_correct_rate": correct.mean(axis=0) if len(submissions) else np.zeros(key_matrix.question_count)
+    }
@@ -0,0 +1,100 @@
+import time
+import hashlib
+
+
+class ContentVersions:
+    """
+    Brojaci verzija sadrzaja u Redisu, osnova za ETag-ove.
+    - svaki kviz ima svoj brojac (polje hash-a), povecava se pri svakoj izmjeni
+    - katalog (liste kvizova) ima jedan brojac koji se povecava pri svakoj izmjeni bilo kog kviza
+    Brojac se inicijalizuje vremenom u ms, tako da se nakon gubitka Redis
+    podataka ne vraca na vrijednosti koje su klijenti vec vidjeli.
+    Verzija se povecava tek nakon upisa u MongoDB.
+    """
+
+    QUIZ_KEY = "quiz_versions"
+    CATALOG_KEY = "quiz_versions:catalog"
+
+    def __init__(self, redis_client):
+        self.redis = redis_client
+
+    @staticmethod
+    def _seed() -> int:
+        return int(time.time() * 1000)
+
+    def quiz_version(self, quiz_id: str, create: bool = False):
+        """
+        Bez create=True vraca None za kviz koji jos nema brojac, da nasumicni
+        ID-jevi iz zahtjeva ne bi pravili polja u Redisu.
+        """
+        version = self.redis.hget(self.QUIZ_KEY, quiz_id)
+        if version is None:
+            if not create:
+                return None
+            self.redis.hsetnx(self.QUIZ_KEY, quiz_id, self._seed())
+            version = self.redis.hget(self.QUIZ_KEY, quiz_id)
+        return int(version)
+
+    def catalog_version(self) -> int:
+        version = self.redis.get(self.CATALOG_KEY)
+        if version is None:
+            self.redis.set(self.CATALOG_KEY, self._seed(), nx=True)
+            version = self.redis.get(self.CATALOG_KEY)
+        return int(version)
+
+    def bump(self, quiz_id: str) -> None:
+        seed = self._seed()
+        pipe = self.redis.pipeline()
+        pipe.hsetnx(self.QUIZ_KEY, quiz_id, seed)
+        pipe.hincrby(self.QUIZ_KEY, quiz_id, 1)
+        pipe.set(self.CATALOG_KEY, seed, nx=True)
+        pipe.incr(self.CATALOG_KEY)
+        pipe.execute()
+
+    def quiz_etag(self, quiz_id: str, create: bool = False):
+        version = self.quiz_version(quiz_id, create)
+        return f"q-{quiz_id}-{version}" if version is not None else None
+
+    def list_etag(self, scope: str, query_string: bytes) -> str:
+        #razliciti parametri (fields, limit, cursor) su razlicite reprezentacije
+        params = hashlib.sha1(query_string).hexdigest()[:12]
+        return f"{scope}-{self.catalog_version()}-{params}"
+
+
+class AsyncContentVersions(ContentVersions):
+    """
+    Isti brojaci nad redis.asyncio klijentom.
+    """
+
+    async def quiz_version(self, quiz_id: str, create: bool = False):
+        version = await self.redis.hget(self.QUIZ_KEY, quiz_id)
+        if version is None:
+            if not create:
+                return None
+            await self.redis.hsetnx(self.QUIZ_KEY, quiz_id, self._seed())
+            version = await self.redis.hget(self.QUIZ_KEY, quiz_id)
+        return int(version)
+
+    async def catalog_version(self) -> int:
+        version = await self.redis.get(self.CATALOG_KEY)
+        if version is None:
+            await self.redis.set(self.CATALOG_KEY, self._seed(), nx=True)
+            version = await self.redis.get(self.CATALOG_KEY)
+        return int(version)
+
+    async def bump(self, quiz_id: str) -> None:
+        seed = self._seed()
+        async with self.redis.pipeline() as pipe:
+            pipe.hsetnx(self.QUIZ_KEY, quiz_id, seed)
+            pipe.hincrby(self.QUIZ_KEY, quiz_id, 1)
+            pipe.set(self.CATALOG_KEY, seed, nx=True)
+            pipe.incr(self.CATALOG_KEY)
+            await pipe.execute()
+
+    async def quiz_etag(self, quiz_id: str, create: bool = False):
+        version = await self.quiz_version(quiz_id, create)
+        return f"q-{quiz_id}-{version}" if version is not None else None
+
+    async def list_etag(self, scope: str, query_string: bytes) -> str:
+        params = hashlib.sha1(query_string).hexdigest()[:12]
+        return f"{scope}-{await self.catalog_version()}-{params}"
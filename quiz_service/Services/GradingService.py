@@ -0,0 +1,115 @@
+import time
+from Extensions.EmailSender import EmailSender
+from Extensions.ResultPublisher import result_publisher
+from Services.BatchGrading import grade_batch
+from Services.ItemAnalytics import item_analytics, key_matrix_for
+
+email_sender = EmailSender()
+
+#slanje rezultata igracu i glavnom serveru
+def publish_result(answer_key, user_email, time_spent, achieved_points, percentage, job_id=None):
+    print(f"Finished calculating, achieved: {achieved_points} points. Sending to {user_email}")
+
+    
+    try:
+        email_sender.send_quiz_result_email(
+            to_email=user_email,
+            quiz_title=answer_key.title,
+            score=achieved_points,
+            total=answer_key.question_count,
+            percentage=round(percentage, 2)
+        )
+        print(f"Email successfully sent to {user_email}")
+
+    except Exception as e:
+        print(f"Error sending email in background process: {e}")
+
+    
+    try:
+        result_publisher.publish({
+            "user_email": user_email,
+            "quiz_id": answer_key.quiz_id,
+            "quiz_title": answer_key.title,
+            "score": int(achieved_points),
+            "total_questions": answer_key.question_count,
+            "percentage": round(percentage, 2),
+            "time_spent": time_spent,
+            "job_id": job_id
+        })
+
+        print("Result published to main server.")
+
+    except Exception as e:
+        print(f"Error saving result to main server: {e}")
+
+    return {
+        "quiz_id": answer_key.quiz_id,
+        "score": int(achieved_points),
+        "total_points": answer_key.total_points,
+        "total_questions": answer_key.question_count,
+        "percentage": round(percentage, 2)
+    }
+
+#ishodi po pitanju za analizu pitanja; greska ovdje ne smije zaustaviti ocjenjivanje
+def record_outcomes(answer_key, graded, job_ids):
+    try:
+        item_analytics.record(answer_key, graded, job_ids)
+    except Exception as e:
+        print(f"Error recording item analytics for quiz {answer_key.quiz_id}: {e}")
+
+#pokretanje procesa
+def process_quick_task(answer_key, user_answers, user_email, time_spent, job_id=None):
+    print(f"Asynchronous processing started for {user_email}...")
+    time.sleep(10)  
+
+    #ista vektorizovana ocjena kao za grupu, da bi ishod po pitanju ostao sacuvan
+    graded = grade_batch(answer_key, [user_answers], key_matrix=key_matrix_for(answer_key))
+    record_outcomes(answer_key, graded, [job_id])
+
+    return publish_result(answer_key, user_email, time_spent, int(graded["points"][0]), float(graded["percentages"][0]), job_id)
+
+#ocjenjivanje vise predaja istog kviza odjednom (grupa poslova iz reda ili ponovno ocjenjivanje)
+def process_batch_task(answer_key, jobs):
+    print(f"Asynchronous batch processing started for {len(jobs)} submission(s)...")
+    #ista simulirana obrada kao u process_quick_task, jednom po grupi umjesto po predaji
+    time.sleep(10)
+
+    key_matrix = key_matrix_for(answer_key)
+    try:
+        graded = grade_batch(answer_key, [job.get("answers", []) for job in jobs], key_matrix=key_matrix)
+        record_outcomes(answer_key, graded, [job.get("job_id") for job in jobs])
+        scores = [(int(graded["points"][i]), float(graded["percentages"][i])) for i in range(len(jobs))]
+    except Exception as e:
+        #neispravna predaja ne smije oboriti cijelu grupu, ocjenjujemo jednu po jednu
+        print(f"Batch grading failed ({e}), grading {len(jobs)} submission(s) one by one")
+        scores = [grade_single(answer_key, key_matrix, job) for job in jobs]
+
+    #rezultat sa "error" kljucem oznacava predaju koja nije ocijenjena
+    results = []
+    for job, score in zip(jobs, scores):
+        if isinstance(score, Exception):
+            results.append({"error": f"Grading failed: {score}"})
+            continue
+        try:
+            results.append(publish_result(
+                answer_key,
+                job.get("user_email"),
+                job.get("time_spent"),
+                score[0],
+                score[1],
+                job.get("job_id")
+            ))
+        except Exception as e:
+            print(f"Error publishing result of job {job.get('job_id')}: {e}")
+            results.append({"error": f"Publishing failed: {e}"})
+    return results
+
+def grade_single(answer_key, key_matrix, job):
+    #vraca (bodovi, procenat) ili izuzetak, bez bacanja
+    try:
+        graded = grade_batch(answer_key, [job.get("answers", [])], key_matrix=key_matrix)
+        record_outcomes(answer_key, graded, [job.get("job_id")])
+        return int(graded["points"][0]), float(graded["percentages"][0])
+    except Exception as e:
+        print(f"Error grading job {job.get('job_id')}: {e}")
+        return e
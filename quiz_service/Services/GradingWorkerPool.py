@@ -0,0 +1,190 @@
+import os
+import time
+import atexit
+import threading
+import multiprocessing
+from Extensions.JobQueue import create_job_queue
+from Services.GradingService import process_quick_task, process_batch_task
+from Services.AnswerKeyCache import answer_key_cache
+
+
+def _set_status(job_queue, jobs, fields):
+    for job in jobs:
+        if job.get("job_id"):
+            try:
+                job_queue.set_status(job["job_id"], fields)
+            except Exception as e:
+                print(f"Could not update status of job {job['job_id']}: {e}")
+
+
+def _grade_group(job_queue, quiz_id, jobs):
+    not_before = max(job.get("key_compiled_at", 0.0) for job in jobs)
+    answer_key = answer_key_cache.get(quiz_id, not_before=not_before)
+    if not answer_key:
+        print(f"Quiz {quiz_id} not found, {len(jobs)} grading job(s) dropped")
+        _set_status(job_queue, jobs, {"status": "failed", "error": "Quiz not found"})
+        return
+
+    _set_status(job_queue, jobs, {"status": "grading"})
+
+    if len(jobs) == 1:
+        job = jobs[0]
+        results = [process_quick_task(
+            answer_key, job.get("answers", []), job.get("user_email"), job.get("time_spent"), job_id=job.get("job_id")
+        )]
+    else:
+        results = process_batch_task(answer_key, jobs)
+
+    for job, result in zip(jobs, results):
+        if "error" in result:
+            _set_status(job_queue, [job], {"status": "failed", "error": result["error"]})
+        else:
+            _set_status(job_queue, [job], {"status": "done", **result})
+
+
+def _worker_loop(job_queue, stop_event, batch_size):
+    #svaki worker proces ima svoj kes kljuceva i svoju konekciju ka MongoDB
+    while not stop_event.is_set():
+        try:
+            job = job_queue.pop(timeout=5)
+            if job is None:
+                continue
+
+            #ako u redu ceka jos poslova, uzimamo ih odmah i ocjenjujemo grupno po kvizu
+            jobs = [job]
+            while len(jobs) < batch_size:
+                next_job = job_queue.pop_nowait()
+                if next_job is None:
+                    break
+                jobs.append(next_job)
+        except Exception as e:
+            print(f"Grading queue error: {e}")
+            time.sleep(1)
+            continue
+
+        groups = {}
+        for job in jobs:
+            groups.setdefault(job["quiz_id"], []).append(job)
+
+        for quiz_id, group in groups.items():
+            try:
+                _grade_group(job_queue, quiz_id, group)
+            except Exception as e:
+                print(f"Error while grading {len(group)} job(s) for quiz {quiz_id}: {e}")
+                _set_status(job_queue, group, {"status": "failed", "error": str(e)})
+            finally:
+                for job in group:
+                    job_queue.ack(job)
+
+
+class GradingWorkerPool:
+    """
+    Fiksni broj worker procesa koji preuzimaju poslove ocjenjivanja iz reda.
+    Velicina se podesava preko GRADING_WORKERS, a najveca grupa poslova koju
+    worker ocjenjuje odjednom preko GRADING_BATCH_SIZE.
+    """
+
+    def __init__(self, size: int | None = None, batch_size: int | None = None):
+        self.size = size or int(os.getenv("GRADING_WORKERS", 4))
+        self.batch_size = batch_size or int(os.getenv("GRADING_BATCH_SIZE", 64))
+        self._ctx = multiprocessing.get_context("spawn")
+        self.heartbeat_interval = float(os.getenv("GRADING_HEARTBEAT_INTERVAL", 10))
+        self._stop_event = None
+        self._heartbeat_stop = threading.Event()
+        self._lock = threading.Lock()
+        self._workers = []
+        self.queue = None
+
+    def _get_queue(self):
+        if self.queue is None:
+            self.queue = create_job_queue("grading", self._ctx)
+        return self.queue
+
+    def start(self):
+        with self._lock:
+            if self._workers:
+                return
+
+            #heartbeat ide prije oporavka, da druga instanca koja se upravo
+            #podize ne bi proglasila ovu mrtvom
+            self._get_queue().heartbeat()
+            self._recover()
+
+            self._stop_event = self._ctx.Event()
+            self._workers = [self._spawn(i) for i in range(self.size)]
+
+            self._heartbeat_stop.clear()
+            threading.Thread(target=self._heartbeat_loop, name="grading-heartbeat", daemon=True).start()
+
+            atexit.register(self.stop)
+        print(f"Grading pool started with {self.size} worker(s)")
+
+    def _spawn(self, slot: int):
+        p = self._ctx.Process(
+            target=_worker_loop,
+            args=(self.queue.for_worker(slot), self._stop_event, self.batch_size),
+            name=f"grading-worker-{slot}",
+            daemon=True
+        )
+        p.start()
+        return p
+
+    def _replace_dead_workers(self):
+        with self._lock:
+            if self._heartbeat_stop.is_set():
+                return
+            for slot, p in enumerate(self._workers):
+                if p.is_alive():
+                    continue
+                #posao koji je worker preuzeo vraca se u red prije nego sto novi worker krene
+                requeued = self.queue.requeue_worker(slot)
+                print(f"Grading worker {slot} died (exit code {p.exitcode}), "
+                      f"{requeued} job(s) requeued, starting a new one")
+                self._workers[slot] = self._spawn(slot)
+
+    def _recover(self):
+        recovered = self.queue.recover()
+        if recovered:
+            print(f"Recovered {recovered} unfinished grading job(s)")
+
+    def _heartbeat_loop(self):
+        #usput se preuzimaju poslovi instanci koje su pale bez gasenja
+        while not self._heartbeat_stop.wait(self.heartbeat_interval):
+            try:
+                self.queue.heartbeat()
+                self._replace_dead_workers()
+                self._recover()
+            except Exception as e:
+                print(f"Grading heartbeat error: {e}")
+
+    def submit(self, job: dict):
+        #web procesi samo stavljaju posao u trajni red; ocjenjuje ga proces koji je
+        #pokrenuo pool (run-grading-workers ili START_GRADING_WORKERS)
+        self._get_queue().push(job)
+
+    def set_status(self, job_id: str, fields: dict):
+        self._get_queue().set_status(job_id, fields)
+
+    def get_status(self, job_id: str):
+        return self._get_queue().get_status(job_id)
+
+    def stop(self, timeout: int = 10):
+        with self._lock:
+            if not self._workers:
+                return
+
+            self._stop_event.set()
+            self._heartbeat_stop.set()
+            for p in self._workers:
+                p.join(timeout)
+                if p.is_alive():
+                    p.terminate()
+            self._workers = []
+
+        try:
+            self.queue.release()
+        except Exception as e:
+            print(f"Could not release grading instance: {e}")
+
+
+grading_pool = GradingWorkerPool()
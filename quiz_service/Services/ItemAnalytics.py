@@ -0,0 +1,286 @@
+import json
+import hashlib
+from datetime import datetime
+from functools import lru_cache
+import numpy as np
+from bson import Binary
+from pymongo.errors import BulkWriteError
+from Services.BatchGrading import KeyMatrix, build_key_matrix
+
+
+@lru_cache(maxsize=256)
+def key_matrix_for(answer_key) -> KeyMatrix:
+    #kljuc odgovora je nepromjenljiv, pa se matrica pravi jednom po verziji kljuca
+    return build_key_matrix(answer_key)
+
+
+def layout_of(key_matrix: KeyMatrix) -> str:
+    """
+    Otisak rasporeda pitanja, opcija i tacnih odgovora. Bitovi predaje imaju
+    smisla samo uz isti raspored, pa izmijenjen kviz dobija nove agregate.
+    """
+    raw = json.dumps([[list(columns) for columns in key_matrix.columns], key_matrix.key.tolist()])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def pack(row: np.ndarray) -> Binary:
+    return Binary(np.packbits(row).tobytes())
+
+
+def unpack(blobs: list, width: int) -> np.ndarray:
+    #bitovi svih predaja imaju istu duzinu, pa se raspakuju kao jedna matrica
+    if not blobs or width == 0:
+        return np.zeros((len(blobs), width), dtype=bool)
+    packed = np.frombuffer(b"".join(blobs), dtype=np.uint8).reshape(len(blobs), -1)
+    return np.unpackbits(packed, axis=1, count=width).astype(bool)
+
+
+def matrix_sums(correct: np.ndarray, selected: np.ndarray, answered: np.ndarray) -> dict:
+    """
+    Dovoljne statistike za p-vrijednost i point-biserial: broj predaja, suma
+    i suma kvadrata ukupnog skora (broj tacnih pitanja) i po pitanju broj
+    tacnih i suma skorova onih koji su ga rijesili. Sve se sabira, pa se
+    agregat azurira inkrementalno.
+    """
+    scores = correct.sum(axis=1, dtype=np.int64)
+    return {
+        "n": int(len(scores)),
+        "sum_score": int(scores.sum()),
+        "sum_score_sq": int((scores * scores).sum()),
+        "correct": correct.sum(axis=0, dtype=np.int64),
+        "score_correct": scores @ correct.astype(np.int64),
+        "answered": answered.sum(axis=0, dtype=np.int64),
+        "options": selected.sum(axis=0, dtype=np.int64)
+    }
+
+
+def summarize(answer_key, stats: dict | None) -> dict:
+    """
+    Analiza pitanja iz agregata, vektorizovano po pitanjima:
+    tezina (p = udio tacnih), point-biserial korelacija pitanja sa ukupnim
+    skorom i sa skorom bez tog pitanja (rest) i ucestalost izbora opcija.
+    """
+    key_matrix = key_matrix_for(answer_key)
+    q = key_matrix.question_count
+    stats = stats or {}
+
+    n = int(stats.get("n", 0))
+    correct = np.array(stats.get("correct", [0] * q), dtype=float)
+    score_correct = np.array(stats.get("score_correct", [0] * q), dtype=float)
+    answered = np.array(stats.get("answered", [0] * q), dtype=np.int64)
+    options = np.array(stats.get("options", [0] * key_matrix.option_count), dtype=np.int64)
+
+    result = {
+        "quiz_id": answer_key.quiz_id,
+        "title": answer_key.title,
+        "submissions": n,
+        "mean_score": None,
+        "score_sd": None,
+        "questions": []
+    }
+    if n == 0:
+        p = point_biserial = rest = np.full(q, np.nan)
+    else:
+        mean = stats["sum_score"] / n
+        variance = max(stats["sum_score_sq"] / n - mean * mean, 0.0)
+        p = correct / n
+        pq = np.sqrt(p * (1 - p))
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            #cov(pitanje, skor) / (sd(pitanje) * sd(skor))
+            covariance = score_correct / n - p * mean
+            point_biserial = covariance / (pq * np.sqrt(variance))
+
+            #skor bez pitanja: Y = X - c, c^2 = c
+            rest_mean = mean - p
+            rest_variance = (stats["sum_score_sq"] - 2 * score_correct + correct) / n - rest_mean ** 2
+            rest_covariance = (score_correct - correct) / n - p * rest_mean
+            rest = rest_covariance / (pq * np.sqrt(np.maximum(rest_variance, 0.0)))
+
+        result["mean_score"] = round(mean, 4)
+        result["score_sd"] = round(float(np.sqrt(variance)), 4)
+
+    def number(value):
+        return None if not np.isfinite(value) else round(float(value), 4)
+
+    for i, columns in enumerate(key_matrix.columns):
+        result["questions"].append({
+            "question_index": i,
+            "answered": int(answered[i]),
+            "correct": int(correct[i]),
+            "p_value": number(p[i]),
+            "point_biserial": number(point_biserial[i]),
+            "point_biserial_rest": number(rest[i]),
+            "options": [
+                {
+                    "value": value,
+                    "is_correct": bool(key_matrix.key[col]),
+                    "count": int(options[col]),
+                    "frequency": number(options[col] / n) if n else None
+                }
+                for value, col in columns.items()
+            ]
+        })
+    return result
+
+
+class ItemAnalytics:
+    """
+    Ishod svake ocijenjene predaje se cuva kao bitset (tacna pitanja,
+    izabrane opcije, odgovorena pitanja) u kolekciji submission_outcomes, a
+    sume potrebne za analizu pitanja se u item_stats uvecavaju ($inc) pri
+    svakom ocjenjivanju. Citanje analize je zato O(pitanja), bez obzira na
+    broj predaja. Agregati se mogu ponovo izracunati iz bitseta (rebuild).
+    """
+
+    OUTCOMES = "submission_outcomes"
+    STATS = "item_stats"
+
+    def __init__(self, batch_size: int = 5000):
+        self.batch_size = batch_size
+        self._outcomes = None
+        self._stats = None
+
+    @property
+    def outcomes(self):
+        if self._outcomes is None:
+            from Database.database import db_mongo
+            self._outcomes = db_mongo.get_collection(self.OUTCOMES)
+        return self._outcomes
+
+    @property
+    def stats(self):
+        if self._stats is None:
+            from Database.database import db_mongo
+            self._stats = db_mongo.get_collection(self.STATS)
+        return self._stats
+
+    @staticmethod
+    def stats_id(quiz_id: str, layout: str) -> str:
+        return f"{quiz_id}:{layout}"
+
+    def record(self, answer_key, graded: dict, job_ids: list) -> int:
+        """
+        graded je rezultat grade_batch za predaje sa job_ids. Predaja koja je
+        vec upisana (isti job_id, npr. posao vracen u red nakon restarta) se
+        ne broji ponovo. Vraca broj novih predaja.
+        """
+        key_matrix = key_matrix_for(answer_key)
+        layout = layout_of(key_matrix)
+        correct, selected, answered = graded["correct"], graded["selected"], graded["answered"]
+
+        now = datetime.utcnow()
+        docs = [{
+            "quiz_id": answer_key.quiz_id,
+            "layout": layout,
+            "job_id": job_id,
+            "score": int(correct[i].sum()),
+            "correct": pack(correct[i]),
+            "selected": pack(selected[i]),
+            "answered": pack(answered[i]),
+            "created_at": now
+        } for i, job_id in enumerate(job_ids)]
+
+        keep = np.ones(len(docs), dtype=bool)
+        try:
+            self.outcomes.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                if error.get("code") != 11000:
+                    raise
+                keep[error["index"]] = False
+
+        if not keep.any():
+            return 0
+
+        self._increment(answer_key.quiz_id, layout, key_matrix,
+                        matrix_sums(correct[keep], selected[keep], answered[keep]))
+        return int(keep.sum())
+
+    def _empty(self, quiz_id: str, layout: str, key_matrix: KeyMatrix) -> dict:
+        q = key_matrix.question_count
+        return {
+            "quiz_id": quiz_id,
+            "layout": layout,
+            "n": 0,
+            "sum_score": 0,
+            "sum_score_sq": 0,
+            "correct": [0] * q,
+            "score_correct": [0] * q,
+            "answered": [0] * q,
+            "options": [0] * key_matrix.option_count
+        }
+
+    def _increment(self, quiz_id: str, layout: str, key_matrix: KeyMatrix, sums: dict) -> None:
+        _id = self.stats_id(quiz_id, layout)
+
+        #nizovi moraju postojati prije $inc po indeksu ("correct.3")
+        empty = self._empty(quiz_id, layout, key_matrix)
+        self.stats.update_one({"_id": _id}, {"$setOnInsert": empty}, upsert=True)
+
+        inc = {"n": sums["n"], "sum_score": sums["sum_score"], "sum_score_sq": sums["sum_score_sq"]}
+        for field in ("correct", "score_correct", "answered", "options"):
+            for i in np.flatnonzero(sums[field]):
+                inc[f"{field}.{i}"] = int(sums[field][i])
+        self.stats.update_one({"_id": _id}, {"$inc": inc, "$set": {"updated_at": datetime.utcnow()}})
+
+    def rebuild(self, answer_key) -> int:
+        """
+        Ponovo racuna agregate kviza iz sacuvanih bitseta, u komadima od
+        batch_size predaja. Vraca broj predaja.
+        """
+        key_matrix = key_matrix_for(answer_key)
+        layout = layout_of(key_matrix)
+        q, o = key_matrix.question_count, key_matrix.option_count
+
+        totals = self._empty(answer_key.quiz_id, layout, key_matrix)
+        for field in ("correct", "score_correct", "answered", "options"):
+            totals[field] = np.array(totals[field], dtype=np.int64)
+
+        cursor = self.outcomes.find(
+            {"quiz_id": answer_key.quiz_id, "layout": layout},
+            {"correct": 1, "selected": 1, "answered": 1, "_id": 0},
+            batch_size=self.batch_size
+        )
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) == self.batch_size:
+                self._add_batch(totals, batch, q, o)
+                batch = []
+        self._add_batch(totals, batch, q, o)
+
+        for field in ("correct", "score_correct", "answered", "options"):
+            totals[field] = totals[field].tolist()
+        totals["updated_at"] = datetime.utcnow()
+        self.stats.replace_one({"_id": self.stats_id(answer_key.quiz_id, layout)}, totals, upsert=True)
+        return totals["n"]
+
+    @staticmethod
+    def _add_batch(totals: dict, batch: list, q: int, o: int) -> None:
+        if not batch:
+            return
+        sums = matrix_sums(
+            unpack([doc["correct"] for doc in batch], q),
+            unpack([doc["selected"] for doc in batch], o),
+            unpack([doc["answered"] for doc in batch], q)
+        )
+        for field, value in sums.items():
+            totals[field] += value
+
+    def report(self, answer_key) -> dict:
+        layout = layout_of(key_matrix_for(answer_key))
+        stats = self.stats.find_one({"_id": self.stats_id(answer_key.quiz_id, layout)})
+        return summarize(answer_key, stats)
+
+    async def report_async(self, answer_key, stats_collection) -> dict:
+        layout = layout_of(key_matrix_for(answer_key))
+        stats = await stats_collection.find_one({"_id": self.stats_id(answer_key.quiz_id, layout)})
+        return summarize(answer_key, stats)
+
+    def delete_quiz(self, quiz_id: str) -> None:
+        self.outcomes.delete_many({"quiz_id": quiz_id})
+        self.stats.delete_many({"quiz_id": quiz_id})
+
+
+item_analytics = ItemAnalytics()
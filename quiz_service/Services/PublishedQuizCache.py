@@ -0,0 +1,335 @@
+import os
+import time
+import asyncio
+import uuid
+import threading
+from bisect import bisect_right
+from bson import ObjectId
+from redis.exceptions import WatchError
+from Extensions.JsonProvider import dumps_bytes
+from Services.QuizListing import SUMMARY_FIELDS, build_pipeline
+
+
+class PublishedQuizCache:
+    """
+    Kes objavljenih kvizova u Redis hash-u (quiz_id -> JSON sazetka kviza).
+    Ocekuje Redis klijenta bez decode_responses, jer se sacuvani JSON bajtovi
+    bez parsiranja spajaju u odgovor.
+
+    - odobravanje/brisanje kviza mijenja samo jedno polje hash-a
+    - id-evi su i u sorted set-u (svi sa skorom 0), pa se strana cita sa
+      ZRANGEBYLEX od kursora, bez citanja cijelog kataloga
+    - po isteku svjezine vraca se stari sadrzaj, a osvjezavanje radi jedan proces u pozadini
+    - samo jedan proces gradi kes iz MongoDB (Redis lock), ostali sacekaju rezultat
+    - svaka izmjena jednog kviza povecava brojac generacije; rebuild koji je
+      citao MongoDB prije izmjene ne zamjenjuje hash nego cita ponovo
+    """
+
+    HASH_KEY = "published_quizzes:h"
+    TMP_KEY = "published_quizzes:tmp"
+    IDS_KEY = "published_quizzes:ids"
+    TMP_IDS_KEY = "published_quizzes:ids:tmp"
+    #v2: kes bez indeksa id-eva se ne smatra spremnim i gradi se ponovo
+    READY_KEY = "published_quizzes:ready:v2"
+    FRESH_KEY = "published_quizzes:fresh"
+    LOCK_KEY = "published_quizzes:lock"
+    GEN_KEY = "published_quizzes:gen"
+    REBUILD_ATTEMPTS = 3
+
+    RELEASE_SCRIPT = """
+    if redis.call("get", KEYS[1]) == ARGV[1] then
+        return redis.call("del", KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, redis_client, collection):
+        self.redis = redis_client
+        self.collection = collection
+        self.fresh_ttl = int(os.getenv("PUBLISHED_CACHE_TTL", 300))
+        self.lock_ttl_ms = int(os.getenv("PUBLISHED_CACHE_LOCK_MS", 10000))
+        self.wait_seconds = float(os.getenv("PUBLISHED_CACHE_WAIT_SECONDS", 2))
+
+    def _load_summaries(self, match: dict) -> dict:
+        quizzes = self.collection.aggregate(build_pipeline({**match, "status": "APPROVED"}, SUMMARY_FIELDS))
+        entries = {}
+        for q in quizzes:
+            q['_id'] = str(q['_id'])
+            entries[q['_id'].encode()] = dumps_bytes(q)
+        return entries
+
+    def _acquire_lock(self):
+        token = uuid.uuid4().hex
+        if self.redis.set(self.LOCK_KEY, token, nx=True, px=self.lock_ttl_ms):
+            return token
+        return None
+
+    def _release_lock(self, token):
+        self.redis.eval(self.RELEASE_SCRIPT, 1, self.LOCK_KEY, token)
+
+    @staticmethod
+    def _slice(ids: list, limit: int, cursor: str | None) -> list:
+        #ObjectId u hex obliku se sortira isto kao po vremenu kreiranja
+        start = bisect_right(ids, cursor.encode()) if cursor else 0
+        return ids[start:start + limit]
+
+    @staticmethod
+    def _page(ids: list, values: list, limit: int):
+        #JSON niz se slaze od vec serijalizovanih kvizova, bez json.loads/dumps
+        body = b"[" + b",".join(v for v in values if v is not None) + b"]"
+        next_cursor = ids[-1].decode() if len(ids) == limit else None
+        return body, next_cursor
+
+    def _page_from_entries(self, entries: dict, limit: int, cursor: str | None):
+        ids = self._slice(sorted(entries), limit, cursor)
+        return self._page(ids, [entries[i] for i in ids], limit)
+
+    def _range_args(self, limit: int, cursor: str | None):
+        start = b"(" + cursor.encode() if cursor else b"-"
+        return self.IDS_KEY, start, b"+", 0, limit
+
+    def _page_from_redis(self, limit: int, cursor: str | None):
+        ids = self.redis.zrangebylex(*self._range_args(limit, cursor))
+        values = self.redis.hmget(self.HASH_KEY, ids) if ids else []
+        return self._page(ids, values, limit)
+
+    def _queue_swap(self, pipe, entries: dict) -> None:
+        #novi hash se puni pod privremenim kljucem i atomicno zamjenjuje stari
+        pipe.delete(self.TMP_KEY, self.TMP_IDS_KEY)
+        if entries:
+            pipe.hset(self.TMP_KEY, mapping=entries)
+            pipe.zadd(self.TMP_IDS_KEY, dict.fromkeys(entries, 0))
+            pipe.rename(self.TMP_KEY, self.HASH_KEY)
+            pipe.rename(self.TMP_IDS_KEY, self.IDS_KEY)
+        else:
+            pipe.delete(self.HASH_KEY, self.IDS_KEY)
+        pipe.set(self.READY_KEY, 1)
+        pipe.setex(self.FRESH_KEY, self.fresh_ttl, 1)
+
+    def rebuild(self) -> dict:
+        """
+        Hash se zamjenjuje samo ako se generacija nije promijenila od citanja
+        MongoDB-a (WATCH), inace bi upsert/remove koji je stigao izmedju bio
+        pregazen. Posle REBUILD_ATTEMPTS pokusaja kes ostaje kakav jeste.
+        """
+        for _ in range(self.REBUILD_ATTEMPTS):
+            generation = self.redis.get(self.GEN_KEY)
+            entries = self._load_summaries({})
+
+            with self.redis.pipeline() as pipe:
+                try:
+                    pipe.watch(self.GEN_KEY)
+                    if pipe.get(self.GEN_KEY) != generation:
+                        continue
+                    pipe.multi()
+                    self._queue_swap(pipe, entries)
+                    pipe.execute()
+                    return entries
+                except WatchError:
+                    continue
+
+        print("Published cache rebuild skipped, quizzes kept changing")
+        return entries
+
+    def _rebuild_in_background(self):
+        token = self._acquire_lock()
+        if not token:
+            return
+
+        def run():
+            try:
+                self.rebuild()
+            except Exception as e:
+                print(f"Published cache refresh failed: {e}")
+            finally:
+                self._release_lock(token)
+
+        threading.Thread(target=run, name="published-cache-refresh", daemon=True).start()
+
+    def get_page_json(self, limit: int, cursor: str | None = None):
+        """
+        Vraca (JSON bajtovi strane, next_cursor).
+        """
+        ready, fresh = self.redis.mget(self.READY_KEY, self.FRESH_KEY)
+
+        if ready:
+            if not fresh:
+                #stale-while-revalidate: vracamo postojece, osvjezava jedan proces
+                self._rebuild_in_background()
+            print("CACHE HIT: redis data")
+            return self._page_from_redis(limit, cursor)
+
+        print("CACHE MISS: MongoDB data")
+        token = self._acquire_lock()
+        if token:
+            try:
+                return self._page_from_entries(self.rebuild(), limit, cursor)
+            finally:
+                self._release_lock(token)
+
+        #neko drugi vec gradi kes, sacekamo ga umjesto da svi udaramo u MongoDB
+        deadline = time.monotonic() + self.wait_seconds
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            if self.redis.exists(self.READY_KEY):
+                return self._page_from_redis(limit, cursor)
+
+        return self._page_from_entries(self._load_summaries({}), limit, cursor)
+
+    def upsert(self, quiz_id: str) -> None:
+        #i bez gotovog kesa generacija raste, da rebuild u toku ne propusti izmjenu
+        if not self.redis.exists(self.READY_KEY):
+            self.redis.incr(self.GEN_KEY)
+            return
+
+        entries = self._load_summaries({"_id": ObjectId(quiz_id)})
+        pipe = self.redis.pipeline()
+        self._queue_patch(pipe, quiz_id, entries)
+        pipe.execute()
+
+    def _queue_patch(self, pipe, quiz_id: str, entries: dict) -> None:
+        if entries:
+            pipe.hset(self.HASH_KEY, mapping=entries)
+            pipe.zadd(self.IDS_KEY, dict.fromkeys(entries, 0))
+        else:
+            pipe.hdel(self.HASH_KEY, quiz_id)
+            pipe.zrem(self.IDS_KEY, quiz_id)
+        pipe.incr(self.GEN_KEY)
+
+    def remove(self, quiz_id: str) -> None:
+        pipe = self.redis.pipeline()
+        self._queue_patch(pipe, quiz_id, {})
+        pipe.execute()
+
+    def invalidate(self) -> None:
+        #kes koji nije spreman se pri sljedecem citanju gradi iz MongoDB
+        self.redis.delete(self.READY_KEY, self.FRESH_KEY)
+
+    def warm_up(self) -> None:
+        token = self._acquire_lock()
+        if not token:
+            return
+        try:
+            self.rebuild()
+            print(f"Published quiz cache warmed up with {self.redis.hlen(self.HASH_KEY)} quiz(zes)")
+        finally:
+            self._release_lock(token)
+
+
+class AsyncPublishedQuizCache(PublishedQuizCache):
+    """
+    Isti kes (isti kljucevi i format) nad redis.asyncio klijentom i Motor
+    kolekcijom, za async servis.
+    """
+
+    def __init__(self, redis_client, collection):
+        super().__init__(redis_client, collection)
+        self._tasks = set()
+
+    async def _load_summaries(self, match: dict) -> dict:
+        entries = {}
+        async for q in self.collection.aggregate(build_pipeline({**match, "status": "APPROVED"}, SUMMARY_FIELDS)):
+            q['_id'] = str(q['_id'])
+            entries[q['_id'].encode()] = dumps_bytes(q)
+        return entries
+
+    async def _acquire_lock(self):
+        token = uuid.uuid4().hex
+        if await self.redis.set(self.LOCK_KEY, token, nx=True, px=self.lock_ttl_ms):
+            return token
+        return None
+
+    async def _release_lock(self, token):
+        await self.redis.eval(self.RELEASE_SCRIPT, 1, self.LOCK_KEY, token)
+
+    async def _page_from_redis(self, limit: int, cursor: str | None):
+        ids = await self.redis.zrangebylex(*self._range_args(limit, cursor))
+        values = await self.redis.hmget(self.HASH_KEY, ids) if ids else []
+        return self._page(ids, values, limit)
+
+    async def rebuild(self) -> dict:
+        for _ in range(self.REBUILD_ATTEMPTS):
+            generation = await self.redis.get(self.GEN_KEY)
+            entries = await self._load_summaries({})
+
+            async with self.redis.pipeline() as pipe:
+                try:
+                    await pipe.watch(self.GEN_KEY)
+                    if await pipe.get(self.GEN_KEY) != generation:
+                        continue
+                    pipe.multi()
+                    self._queue_swap(pipe, entries)
+                    await pipe.execute()
+                    return entries
+                except WatchError:
+                    continue
+
+        print("Published cache rebuild skipped, quizzes kept changing")
+        return entries
+
+    async def _refresh(self):
+        token = await self._acquire_lock()
+        if not token:
+            return
+        try:
+            await self.rebuild()
+        except Exception as e:
+            print(f"Published cache refresh failed: {e}")
+        finally:
+            await self._release_lock(token)
+
+    def _rebuild_in_background(self):
+        task = asyncio.create_task(self._refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def get_page_json(self, limit: int, cursor: str | None = None):
+        ready, fresh = await self.redis.mget(self.READY_KEY, self.FRESH_KEY)
+
+        if ready:
+            if not fresh:
+                self._rebuild_in_background()
+            return await self._page_from_redis(limit, cursor)
+
+        token = await self._acquire_lock()
+        if token:
+            try:
+                return self._page_from_entries(await self.rebuild(), limit, cursor)
+            finally:
+                await self._release_lock(token)
+
+        deadline = time.monotonic() + self.wait_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            if await self.redis.exists(self.READY_KEY):
+                return await self._page_from_redis(limit, cursor)
+
+        return self._page_from_entries(await self._load_summaries({}), limit, cursor)
+
+    async def upsert(self, quiz_id: str) -> None:
+        if not await self.redis.exists(self.READY_KEY):
+            await self.redis.incr(self.GEN_KEY)
+            return
+
+        entries = await self._load_summaries({"_id": ObjectId(quiz_id)})
+        async with self.redis.pipeline() as pipe:
+            self._queue_patch(pipe, quiz_id, entries)
+            await pipe.execute()
+
+    async def remove(self, quiz_id: str) -> None:
+        async with self.redis.pipeline() as pipe:
+            self._queue_patch(pipe, quiz_id, {})
+            await pipe.execute()
+
+    async def invalidate(self) -> None:
+        await self.redis.delete(self.READY_KEY, self.FRESH_KEY)
+
+    async def warm_up(self) -> None:
+        token = await self._acquire_lock()
+        if not token:
+            return
+        try:
+            await self.rebuild()
+            print(f"Published quiz cache warmed up with {await self.redis.hlen(self.HASH_KEY)} quiz(zes)")
+        finally:
+            await self._release_lock(token)
@@ -0,0 +1,125 @@
+import os
+from bson import ObjectId
+from bson.errors import InvalidId
+from Extensions.JsonProvider import dumps_bytes
+
+#polja koja liste vracaju ako fields= nije zadat
+SUMMARY_FIELDS = ("title", "author_id", "duration", "status", "rejection_reason", "created_at", "question_count")
+ALLOWED_FIELDS = set(SUMMARY_FIELDS) | {"questions"}
+
+DEFAULT_PAGE_SIZE = int(os.getenv("QUIZ_PAGE_SIZE", 100))
+MAX_PAGE_SIZE = int(os.getenv("QUIZ_MAX_PAGE_SIZE", 500))
+EXPORT_BATCH_SIZE = int(os.getenv("QUIZ_EXPORT_BATCH_SIZE", 200))
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def parse_list_args(args):
+    """
+    Cita fields, limit i cursor iz query stringa.
+    Vraca (fields, limit, cursor) ili baca ValueError sa porukom za klijenta.
+    """
+    fields = SUMMARY_FIELDS
+    if args.get("fields"):
+        fields = tuple(dict.fromkeys(f.strip() for f in args["fields"].split(",") if f.strip()))
+        unknown = [f for f in fields if f not in ALLOWED_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(sorted(ALLOWED_FIELDS))}")
+
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError("limit must be a number")
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    cursor = args.get("cursor") or None
+    if cursor:
+        try:
+            ObjectId(cursor)
+        except (InvalidId, TypeError):
+            raise ValueError("Invalid cursor")
+
+    return fields, limit, cursor
+
+
+def build_pipeline(match: dict, fields, limit: int | None = None, cursor: str | None = None, hide_answers: bool = False) -> list:
+    """
+    Keyset paginacija po _id (rastuce) sa projekcijom na serveru.
+    """
+    if cursor:
+        match = {**match, "_id": {"$gt": ObjectId(cursor)}}
+
+    projection = {}
+    for field in fields:
+        if field == "question_count":
+            projection["question_count"] = {"$size": {"$ifNull": ["$questions", []]}}
+        else:
+            projection[field] = 1
+
+    pipeline = [{"$match": match}, {"$sort": {"_id": 1}}]
+    if limit:
+        pipeline.append({"$limit": limit})
+    pipeline.append({"$project": projection})
+    if hide_answers and "questions" in fields:
+        pipeline.append({"$project": {"questions.correct_answers": 0}})
+    return pipeline
+
+
+def fetch_page(collection, match: dict, fields, limit: int, cursor: str | None = None, hide_answers: bool = False):
+    """
+    Vraca (kvizovi, next_cursor). next_cursor je None na posljednjoj strani.
+    """
+    quizzes = list(collection.aggregate(build_pipeline(match, fields, limit, cursor, hide_answers)))
+    for q in quizzes:
+        q['_id'] = str(q['_id'])
+
+    next_cursor = quizzes[-1]['_id'] if len(quizzes) == limit else None
+    return quizzes, next_cursor
+
+
+def stream_ndjson(collection, match: dict, fields=None):
+    """
+    Generator koji salje kvizove red po red (NDJSON) direktno iz MongoDB kursora.
+    Bez fields se salju cijeli dokumenti. U memoriji je najvise jedan batch.
+    """
+    if fields:
+        cursor = collection.aggregate(build_pipeline(match, fields), batchSize=EXPORT_BATCH_SIZE)
+    else:
+        cursor = collection.find(match).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE)
+
+    try:
+        for quiz in cursor:
+            quiz['_id'] = str(quiz['_id'])
+            yield dumps_bytes(quiz) + b"\n"
+    finally:
+        cursor.close()
+
+
+async def fetch_page_async(collection, match: dict, fields, limit: int, cursor: str | None = None, hide_answers: bool = False):
+    """
+    fetch_page nad Motor kolekcijom.
+    """
+    quizzes = await collection.aggregate(build_pipeline(match, fields, limit, cursor, hide_answers)).to_list(length=None)
+    for q in quizzes:
+        q['_id'] = str(q['_id'])
+
+    next_cursor = quizzes[-1]['_id'] if len(quizzes) == limit else None
+    return quizzes, next_cursor
+
+
+async def stream_ndjson_async(collection, match: dict, fields=None):
+    """
+    stream_ndjson nad Motor kolekcijom (async generator).
+    """
+    if fields:
+        cursor = collection.aggregate(build_pipeline(match, fields), batchSize=EXPORT_BATCH_SIZE)
+    else:
+        cursor = collection.find(match).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE)
+
+    try:
+        async for quiz in cursor:
+            quiz['_id'] = str(quiz['_id'])
+            yield dumps_bytes(quiz) + b"\n"
+    finally:
+        await cursor.close()
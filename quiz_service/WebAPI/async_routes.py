@@ -0,0 +1,283 @@
+import os
+import uuid
+from datetime import datetime
+import requests
+import redis.asyncio as aioredis
+from bson import ObjectId
+from quart import Blueprint, Response, current_app, request, jsonify
+from Database.database import async_db_mongo
+from Domain.DTOs.dtos import QuizDTO
+from Extensions.JobQueue import AsyncRedisJobQueue
+from Services.AnswerKeyCache import answer_key_cache
+from Services.ItemAnalytics import item_analytics
+from Services.ContentVersions import AsyncContentVersions
+from Services.PublishedQuizCache import AsyncPublishedQuizCache
+from Services.QuizListing import SUMMARY_FIELDS, NDJSON_MIMETYPE, parse_list_args, fetch_page_async, stream_ndjson_async
+
+#iste rute kao WebAPI/routes.py, nad Motor-om i redis.asyncio
+quiz_db_async = Blueprint("quiz_db_async", __name__)
+collection = async_db_mongo.get_collection("quizzes")
+
+redis_client = aioredis.Redis(host=os.getenv("REDIS_HOST", "redis_cache"), port=6379, db=0)
+
+published_cache = AsyncPublishedQuizCache(redis_client, collection)
+content_versions = AsyncContentVersions(redis_client)
+job_queue = AsyncRedisJobQueue("grading")
+outcomes = async_db_mongo.get_collection(item_analytics.OUTCOMES)
+item_stats = async_db_mongo.get_collection(item_analytics.STATS)
+
+async def current_etag(make_etag):
+    try:
+        return await make_etag()
+    except Exception as e:
+        print(f"Redis error: {e}")
+        return None
+
+async def bump_version(quiz_id):
+    try:
+        await content_versions.bump(quiz_id)
+    except Exception as e:
+        print(f"Redis error: {e}")
+
+#isto kao u routes.py: ETag se povecava tek posle izmjene kesa objavljenih
+async def patch_published_cache(patch, quiz_id):
+    try:
+        await patch(quiz_id)
+    except Exception as e:
+        print(f"Redis error: {e}")
+        try:
+            await published_cache.invalidate()
+        except Exception as e:
+            print(f"Redis error: {e}")
+
+#kviz je vec obrisan, greska pri brisanju analize pitanja se samo loguje
+async def delete_item_analytics(quiz_id):
+    try:
+        await outcomes.delete_many({"quiz_id": quiz_id})
+        await item_stats.delete_many({"quiz_id": quiz_id})
+    except Exception as e:
+        print(f"Error deleting item analytics for quiz {quiz_id}: {e}")
+
+def not_modified(etag):
+    response = Response("", status=304)
+    response.set_etag(etag)
+    return response
+
+#blokirajuci HTTP poziv ide u background task, ne drzi event loop
+def notify_admin(quiz_id, title):
+    try:
+        main_server_url = os.getenv("MAIN_SERVER_URL")
+        requests.post(
+            f"{main_server_url}/api/quizzes/notify-admin",
+            json={"quiz_id": quiz_id, "title": title},
+            timeout=5,
+        )
+    except Exception as e:
+        print(f"Greska pri slanju obavjestenja serveru: {e}")
+
+#kreirnaje kviza (moderatro)
+@quiz_db_async.route("/", methods=["POST"])
+async def create_quiz():
+    data = await request.get_json(silent=True) or {}
+    new_quiz = QuizDTO.from_request(data)
+
+    quiz_dict = new_quiz.to_disc()
+    quiz_dict.setdefault("status", "PENDING")
+    quiz_dict.setdefault("created_at", datetime.utcnow().isoformat() + "Z")
+
+    result = await collection.insert_one(quiz_dict)
+    quiz_id = str(result.inserted_id)
+    await bump_version(quiz_id)
+
+    current_app.add_background_task(notify_admin, quiz_id, new_quiz.title)
+
+    return jsonify({"message": "Quiz created and pending approval", "id": quiz_id}), 201
+
+#promjena statusa kviza
+@quiz_db_async.route("/<quiz_id>/status", methods=["PATCH"])
+async def update_quiz_status(quiz_id):
+    data = await request.get_json()
+    new_status = data.get("status")
+    reason = data.get("rejection_reason", "")
+
+    update_data = {"status": new_status}
+    if new_status == "REJECTED":
+        update_data["rejection_reason"] = reason
+
+    result = await collection.update_one(
+        {"_id": ObjectId(quiz_id)},
+        {"$set": update_data}
+    )
+
+    if result.matched_count == 0:
+        return jsonify({"message": "Quiz not found"}), 404
+
+    await patch_published_cache(published_cache.upsert, quiz_id)
+    await bump_version(quiz_id)
+    answer_key_cache.invalidate(quiz_id)
+
+    return jsonify({"message": f"Quiz status updated to {new_status}"}), 200
+
+#listanje svih kvizova (sazetak, strana po strana; sljedeca strana u X-Next-Cursor)
+@quiz_db_async.route("/", methods=["GET"])
+async def get_quizzes():
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        fields = None
+        if request.args.get("fields"):
+            try:
+                fields, _, _ = parse_list_args({"fields": request.args["fields"]})
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        return Response(stream_ndjson_async(collection, {}, fields), mimetype=NDJSON_MIMETYPE)
+
+    try:
+        fields, limit, cursor = parse_list_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    etag = await current_etag(lambda: content_versions.list_etag("all", request.query_string))
+    if etag and request.if_none_match.contains(etag):
+        return not_modified(etag)
+
+    quizzes, next_cursor = await fetch_page_async(collection, {}, fields, limit, cursor)
+
+    response = jsonify(quizzes)
+    if etag:
+        response.set_etag(etag)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
+
+#listanje samo odobrenih kvizova
+@quiz_db_async.route("/published", methods=["GET"])
+async def get_published_quizzes():
+    try:
+        fields, limit, cursor = parse_list_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    etag = await current_etag(lambda: content_versions.list_etag("published", request.query_string))
+    if etag and request.if_none_match.contains(etag):
+        return not_modified(etag)
+
+    body = None
+    if fields == SUMMARY_FIELDS:
+        try:
+            body, next_cursor = await published_cache.get_page_json(limit, cursor)
+        except Exception as e:
+            print(f"Redis error: {e}")
+
+    if body is not None:
+        response = Response(body, status=200, mimetype="application/json")
+    else:
+        quizzes, next_cursor = await fetch_page_async(collection, {"status": "APPROVED"}, fields, limit, cursor, hide_answers=True)
+        response = jsonify(quizzes)
+
+    if etag:
+        response.set_etag(etag)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
+
+#slanje odgovora, ocjenjivanje rade isti grading workeri kao u sync servisu
+@quiz_db_async.route("/<quiz_id>/submit", methods=["POST"])
+async def submit_quiz(quiz_id):
+    data = await request.get_json()
+
+    answer_key = await answer_key_cache.get_async(quiz_id, collection)
+    if not answer_key:
+        return jsonify({"message": "Quiz not fount"}), 404
+
+    job_id = uuid.uuid4().hex
+    await job_queue.set_status(job_id, {
+        "status": "queued",
+        "quiz_id": quiz_id,
+        "user_id": data.get("user_id"),
+        "submitted_at": datetime.utcnow().isoformat() + "Z"
+    })
+
+    await job_queue.push({
+        "job_id": job_id,
+        "quiz_id": quiz_id,
+        "key_compiled_at": answer_key.compiled_at,
+        "answers": data.get("answers", []),
+        "user_email": data.get("user_email"),
+        "time_spent": data.get("time_spent")
+    })
+
+    return jsonify({
+        "message": "Quiz processing is started asynchronously. The results will be sent to you by email.",
+        "status": "queued",
+        "job_id": job_id
+    }), 202
+
+#status ocjenjivanja predatog kviza
+@quiz_db_async.route("/submissions/<job_id>", methods=["GET"])
+async def get_submission_status(job_id):
+    try:
+        record = await job_queue.get_status(job_id)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    if not record:
+        return jsonify({"message": "Submission not found"}), 404
+
+    record["job_id"] = job_id
+    return jsonify(record), 200
+
+#brisanje kviza
+@quiz_db_async.route("/<quiz_id>", methods=["DELETE"])
+async def delete_quiz(quiz_id):
+    data = await request.get_json(silent=True) or {}
+    requester_role = data.get("requester_role")
+    requester_id = data.get("requester_id")
+
+    quiz = await collection.find_one({"_id": ObjectId(quiz_id)}, {"author_id": 1})
+    if not quiz:
+        return jsonify({"message": "Quiz not found"}), 404
+
+    if requester_role != "ADMIN" and str(quiz.get("author_id")) != str(requester_id):
+        return jsonify({"message": "Forbidden"}), 403
+
+    await collection.delete_one({"_id": ObjectId(quiz_id)})
+    await patch_published_cache(published_cache.remove, quiz_id)
+    await bump_version(quiz_id)
+    answer_key_cache.invalidate(quiz_id)
+    await delete_item_analytics(quiz_id)
+
+    return jsonify({"status": "deleted"}), 200
+
+#analiza pitanja (tezina, diskriminacija, izbor opcija) iz inkrementalnih agregata
+@quiz_db_async.route("/<quiz_id>/analytics", methods=["GET"])
+async def get_item_analytics(quiz_id):
+    try:
+        answer_key = await answer_key_cache.get_async(quiz_id, collection)
+        if not answer_key:
+            return jsonify({"message": "Quiz not found"}), 404
+        return jsonify(await item_analytics.report_async(answer_key, item_stats)), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+# dobijanje samo jednog kviza
+@quiz_db_async.route("/<quiz_id>", methods=["GET"])
+async def get_quiz_by_id(quiz_id):
+    etag = await current_etag(lambda: content_versions.quiz_etag(quiz_id))
+    if etag and request.if_none_match.contains(etag):
+        return not_modified(etag)
+
+    try:
+        quiz = await collection.find_one({"_id": ObjectId(quiz_id)}, {"questions.correct_answers": 0})
+        if not quiz:
+            return jsonify({"message": "Quiz not found"}), 404
+
+        if etag is None:
+            await current_etag(lambda: content_versions.quiz_version(quiz_id, create=True))
+
+        quiz['_id'] = str(quiz['_id'])
+
+        response = jsonify(quiz)
+        if etag:
+            response.set_etag(etag)
+        return response, 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
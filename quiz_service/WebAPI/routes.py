@@ -1,72 +1,79 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from Database.database import db_mongo
-from Domain.DTOs.dtos import QuizDTO, QuestionDTO
+from Domain.DTOs.dtos import QuizDTO
 from datetime import datetime
 import requests
 import os
 from bson import ObjectId
-import time
-from multiprocessing import Process
-from Extensions.EmailSender import EmailSender
-import json
+from Services.GradingWorkerPool import grading_pool
+from Services.AnswerKeyCache import answer_key_cache
+from Services.ItemAnalytics import item_analytics
+from Services.PublishedQuizCache import PublishedQuizCache
+from Services.ContentVersions import ContentVersions
+from Services.QuizListing import SUMMARY_FIELDS, NDJSON_MIMETYPE, parse_list_args, fetch_page, stream_ndjson
+import uuid
 import redis
 
 
 quiz_db = Blueprint("quiz_db", __name__)
 collection = db_mongo.get_collection("quizzes")
-email_sender = EmailSender()
 
-redis_client = redis.Redis(host=os.getenv("REDIS_HOST", "redis_cache"), port=6379, db=0, decode_responses=True)
+#bez decode_responses: kes cuva gotove JSON bajtove koji se salju bez parsiranja
+redis_client = redis.Redis(host=os.getenv("REDIS_HOST", "redis_cache"), port=6379, db=0)
 
-#pomocna funkcija za brisanje kesa
-def clear_quiz_cache():
+published_cache = PublishedQuizCache(redis_client, collection)
+content_versions = ContentVersions(redis_client)
+
+#ETag iz brojaca verzija; bez Redisa odgovor ide bez ETag-a
+def current_etag(make_etag):
+    try:
+        return make_etag()
+    except Exception as e:
+        print(f"Redis error: {e}")
+        return None
+
+def bump_version(quiz_id):
+    try:
+        content_versions.bump(quiz_id)
+    except Exception as e:
+        print(f"Redis error: {e}")
+
+#ETag se povecava tek kad kes objavljenih vec odrazava izmjenu; ako patch ne uspije,
+#kes se proglasava nespremnim, pa se sljedeca strana gradi iz MongoDB
+def patch_published_cache(patch, quiz_id):
     try:
-        redis_client.delete("published_quizzes")
+        patch(quiz_id)
     except Exception as e:
         print(f"Redis error: {e}")
+        try:
+            published_cache.invalidate()
+        except Exception as e:
+            print(f"Redis error: {e}")
+
+#kviz je vec obrisan, greska pri brisanju analize pitanja se samo loguje
+def delete_item_analytics(quiz_id):
+    try:
+        item_analytics.delete_quiz(quiz_id)
+    except Exception as e:
+        print(f"Error deleting item analytics for quiz {quiz_id}: {e}")
+
+def not_modified(etag):
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
 
 #kreirnaje kviza (moderatro)
 @quiz_db.route("/", methods=["POST"])
 def create_quiz():
     data = request.get_json(silent=True) or {}
-
-    questions = []
-    for q in data.get("questions", []):
-        text = q.get("text") or q.get("question") or ""
-
-        if "correct_answers" in q:
-            correct_answers = q.get("correct_answers") or []
-        else:
-            ans = q.get("answer")
-            correct_answers = [str(ans)] if ans is not None else []
-
-        points = q.get("points", 1)
-
-        questions.append(
-            QuestionDTO(
-                text=text,
-                options=q.get("options", []),
-                correct_answers=correct_answers,
-                points=points,
-            )
-        )
-
-    title = data.get("title") or data.get("name") or "Untitled quiz"
-    author_id = data.get("author_id") or data.get("authorId") or 0
-    duration = data.get("duration") or data.get("time_limit") or 60
-
-    new_quiz = QuizDTO(
-        title=title,
-        author_id=author_id,
-        duration=duration,
-        questions=questions,
-    )
+    new_quiz = QuizDTO.from_request(data)
 
     quiz_dict = new_quiz.to_disc()
     quiz_dict.setdefault("status", "PENDING")
     quiz_dict.setdefault("created_at", datetime.utcnow().isoformat() + "Z")
 
     result = collection.insert_one(quiz_dict)
+    bump_version(str(result.inserted_id))
 
     try:
         main_server_url = os.getenv("MAIN_SERVER_URL")
@@ -99,109 +106,77 @@ def update_quiz_status(quiz_id):
     if result.matched_count == 0:
         return jsonify({"message": "Quiz not found"}), 404
     
-    clear_quiz_cache() #brisemo kes posto se status promijenio
+    #mijenjamo samo taj kviz u kesu objavljenih
+    patch_published_cache(published_cache.upsert, quiz_id)
+    bump_version(quiz_id)
+    answer_key_cache.invalidate(quiz_id)
     
     return jsonify({"message": f"Quiz status updated to {new_status}"}), 200
 
-#listanje svih kvizova
+#listanje svih kvizova (sazetak, strana po strana; sljedeca strana u X-Next-Cursor)
 @quiz_db.route("/", methods=["GET"])
 def get_quizzes():
-    quizzes = list(collection.find())
-    for q in quizzes:
-        q['_id'] = str(q['_id'])
-    return jsonify(quizzes), 200
+    #Accept: application/x-ndjson -> izvoz cijelog kataloga kao stream
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        fields = None
+        if request.args.get("fields"):
+            try:
+                fields, _, _ = parse_list_args({"fields": request.args["fields"]})
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        return Response(stream_with_context(stream_ndjson(collection, {}, fields)), mimetype=NDJSON_MIMETYPE)
 
-#listanje samo odobrenih kvizova
-@quiz_db.route("/published", methods=["GET"])
-def get_published_quizzes():
-    #prvo probamo iz kesa
-    try:
-        cached_quizzes = redis_client.get("published_quizzes")
-        if cached_quizzes:
-            print("CACHE HIT: redis data")
-            return jsonify(json.loads(cached_quizzes)), 200
-    except Exception as e:
-        print(f"Redis error (hit): {e}")
-
-    #ako nema u kesu uzimamo iz mognoDB
-    print("CACHE MISS: MongoDB data")
-    quizzes = list(collection.find({"status": "APPROVED"}))
-
-    for q in quizzes:
-        q['_id'] = str(q['_id'])
-        for question in q.get('questions', []):
-            question.pop("correct_answers", None)
-            
-    #sacuvaj rezultat u redis na svakih 5 min
     try:
-        redis_client.setex("published_quizzes", 300, json.dumps(quizzes))
-    except Exception as e:
-        print(f"Redis error (set): {e}")
-        
-    return jsonify(quizzes), 200
-
-#pokretanje procesa
-def process_quick_task(quiz_data, user_answers, user_email, time_spent):
-    print(f"Asynchronous processing started for {user_email}...")
-    time.sleep(10)  
-
-    correct_count = 0
-    total_points = sum(int(q.get('points', 0)) for q in quiz_data['questions'])
-    achieved_points = 0
-
-    for idx, question in enumerate(quiz_data['questions']):
-        user_ans = next((a for a in user_answers if a.get('question_index') == idx), None)
-
-        if user_ans:
-            u_selected = [str(x).strip() for x in user_ans.get('selected', [])]
-            db_correct = [str(x).strip() for x in question.get('correct_answers', [])]
+        fields, limit, cursor = parse_list_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-            if set(u_selected) == set(db_correct):
-                achieved_points += int(question.get('points', 0))
-                correct_count += 1
+    etag = current_etag(lambda: content_versions.list_etag("all", request.query_string))
+    if etag and request.if_none_match.contains(etag):
+        return not_modified(etag)
 
-    percentage = (achieved_points / total_points * 100) if total_points > 0 else 0
+    quizzes, next_cursor = fetch_page(collection, {}, fields, limit, cursor)
 
-    print(f"Finished calculating, achieved: {achieved_points} points. Sending to {user_email}")
+    response = jsonify(quizzes)
+    if etag:
+        response.set_etag(etag)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
 
-    
-    try:
-        email_sender.send_quiz_result_email(
-            to_email=user_email,
-            quiz_title=quiz_data.get('title', 'Kviz'),
-            score=achieved_points,
-            total=len(quiz_data['questions']),
-            percentage=round(percentage, 2)
-        )
-        print(f"Email successfully sent to {user_email}")
-
-    except Exception as e:
-        print(f"Error sending email in background process: {e}")
-
-    
+#listanje samo odobrenih kvizova
+@quiz_db.route("/published", methods=["GET"])
+def get_published_quizzes():
     try:
-        main_server_url = os.getenv("MAIN_SERVER_URL")
-        internal_token = os.getenv("INTERNAL_API_KEY")
-
-        requests.post(
-            f"{main_server_url}/api/quizzes/internal/results",
-            json={
-                "user_email": user_email,
-                "quiz_id": str(quiz_data.get("_id")),
-                "quiz_title": quiz_data.get("title", "Kviz"),
-                "score": int(achieved_points),
-                "total_questions": len(quiz_data.get("questions", [])),
-                "percentage": round(percentage, 2),
-                "time_spent": time_spent
-            },
-            headers={"X-Internal-Token": internal_token},
-            timeout=5
-        )
+        fields, limit, cursor = parse_list_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        print("Result saved to MySQL (main server).")
+    etag = current_etag(lambda: content_versions.list_etag("published", request.query_string))
+    if etag and request.if_none_match.contains(etag):
+        return not_modified(etag)
+
+    body = None
+    #kes drzi samo sazetke, za druga polja idemo direktno u MongoDB
+    if fields == SUMMARY_FIELDS:
+        try:
+            body, next_cursor = published_cache.get_page_json(limit, cursor)
+        except Exception as e:
+            #ako Redis nije dostupan citamo direktno iz MongoDB
+            print(f"Redis error: {e}")
+
+    if body is not None:
+        response = Response(body, status=200, mimetype="application/json")
+    else:
+        quizzes, next_cursor = fetch_page(collection, {"status": "APPROVED"}, fields, limit, cursor, hide_answers=True)
+        response = jsonify(quizzes)
+
+    if etag:
+        response.set_etag(etag)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
 
-    except Exception as e:
-        print(f"Error saving result to main server: {e}")
 #slanje odgovora i racunanje bodova
 @quiz_db.route("/<quiz_id>/submit", methods=["POST"])
 def submit_quiz(quiz_id):
@@ -211,19 +186,47 @@ def submit_quiz(quiz_id):
 
     time_spent = data.get("time_spent")
 
-    quiz = collection.find_one({"_id": ObjectId(quiz_id)})
-    if not quiz:
+    answer_key = answer_key_cache.get(quiz_id)
+    if not answer_key:
         return jsonify({"message": "Quiz not fount"}), 404
     
-    p = Process(
-    target=process_quick_task,
-    args=(quiz, user_answers, user_email, time_spent))
-    p.start()
+    job_id = uuid.uuid4().hex
+    grading_pool.set_status(job_id, {
+        "status": "queued",
+        "quiz_id": quiz_id,
+        "user_id": data.get("user_id"),
+        "submitted_at": datetime.utcnow().isoformat() + "Z"
+    })
+
+    #u red saljemo samo id kviza, worker sam ucitava kviz
+    grading_pool.submit({
+        "job_id": job_id,
+        "quiz_id": quiz_id,
+        "key_compiled_at": answer_key.compiled_at,
+        "answers": user_answers,
+        "user_email": user_email,
+        "time_spent": time_spent
+    })
 
     return jsonify({
         "message": "Quiz processing is started asynchronously. The results will be sent to you by email.",
-        "status": "processing"
+        "status": "queued",
+        "job_id": job_id
     }), 202
+
+#status ocjenjivanja predatog kviza
+@quiz_db.route("/submissions/<job_id>", methods=["GET"])
+def get_submission_status(job_id):
+    try:
+        record = grading_pool.get_status(job_id)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    if not record:
+        return jsonify({"message": "Submission not found"}), 404
+
+    record["job_id"] = job_id
+    return jsonify(record), 200
     
 #brisanje kviza
 @quiz_db.route("/<quiz_id>", methods=["DELETE"])
@@ -240,19 +243,42 @@ def delete_quiz(quiz_id):
         return jsonify({"message": "Forbidden"}), 403
 
     collection.delete_one({"_id": ObjectId(quiz_id)})
-
-    #brisemo kes
-    clear_quiz_cache()
+    #brisemo kviz iz kesa
+    patch_published_cache(published_cache.remove, quiz_id)
+    bump_version(quiz_id)
+    answer_key_cache.invalidate(quiz_id)
+    delete_item_analytics(quiz_id)
 
     return jsonify({"status": "deleted"}), 200
 
+#analiza pitanja (tezina, diskriminacija, izbor opcija) iz inkrementalnih agregata
+@quiz_db.route("/<quiz_id>/analytics", methods=["GET"])
+def get_item_analytics(quiz_id):
+    try:
+        answer_key = answer_key_cache.get(quiz_id)
+        if not answer_key:
+            return jsonify({"message": "Quiz not found"}), 404
+        return jsonify(item_analytics.report(answer_key)), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
 # dobijanje samo jednog kviza
 @quiz_db.route("/<quiz_id>", methods=["GET"])
 def get_quiz_by_id(quiz_id):
+    #304 se odlucuje samo na osnovu verzije iz Redisa, bez citanja iz MongoDB
+    etag = current_etag(lambda: content_versions.quiz_etag(quiz_id))
+    if etag and request.if_none_match.contains(etag):
+        return not_modified(etag)
+
     try:
         quiz = collection.find_one({"_id": ObjectId(quiz_id)})
         if not quiz:
             return jsonify({"message": "Quiz not found"}), 404
+
+        #kviz bez brojaca (nastao prije verzionisanja) dobija ga za sljedeci zahtjev;
+        #ovaj odgovor ide bez ETag-a jer verzija nije procitana prije dokumenta
+        if etag is None:
+            current_etag(lambda: content_versions.quiz_version(quiz_id, create=True))
         
         quiz['_id'] = str(quiz['_id'])
         
@@ -260,8 +286,11 @@ def get_quiz_by_id(quiz_id):
         if 'questions' in quiz:
             for q in quiz['questions']:
                 q.pop('correct_answers', None)
-        
-        return jsonify(quiz), 200
+
+        response = jsonify(quiz)
+        if etag:
+            response.set_etag(etag)
+        return response, 200
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
@@ -0,0 +1,48 @@
+import os
+import asyncio
+from dotenv import load_dotenv
+from quart import Quart
+from quart_cors import cors
+from WebAPI.async_routes import quiz_db_async, published_cache
+from Services.GradingWorkerPool import grading_pool
+from Extensions.JsonProvider import FastJSONProvider
+from Database.database import async_db_mongo
+
+load_dotenv()
+
+#async varijanta servisa (Quart + Motor + redis.asyncio), iste rute kao create_quiz_app.
+#Poslove ocjenjivanja preuzimaju isti grading workeri preko Redis reda.
+def create_async_quiz_app(start_workers=False):
+    app = Quart(__name__)
+    app.json = FastJSONProvider(app)
+    app = cors(app, allow_origin="*", expose_headers=["X-Next-Cursor"])
+
+    app.register_blueprint(quiz_db_async, url_prefix="/api/quizzes")
+
+    @app.before_serving
+    async def startup():
+        if start_workers:
+            await asyncio.to_thread(grading_pool.start)
+
+        #warm-up gradi samo proces koji dobije Redis lock
+        try:
+            await published_cache.warm_up()
+        except Exception as e:
+            print(f"Published quiz cache warm-up failed: {e}")
+
+    @app.after_serving
+    async def shutdown():
+        async_db_mongo.close()
+
+    return app
+
+#hypercorn asgi:app --bind 0.0.0.0:5001
+#Sa vise hypercorn workera (--workers N) svaki bi podigao svoj grading pool, pa se tada
+#postavlja START_GRADING_WORKERS=false i pool se pokrece u jednom procesu:
+#    flask --app main run-grading-workers
+app = create_async_quiz_app(start_workers=os.getenv("START_GRADING_WORKERS", "true").lower() == "true")
+
+if __name__ == "__main__":
+    port = int(os.getenv("SERVER_PORT", 5001))
+    print(f"Quiz Service (async) pokrenut na portu {port}")
+    app.run(port=port, host='0.0.0.0')
@@ -0,0 +1,107 @@
+"""
+Poredjenje sync (Flask, main.py) i async (Quart + Motor, asgi.py) servisa pod
+velikim brojem istovremenih zahtjeva: requests/s, p50 i p99 za
+/published, /<quiz_id> i /<quiz_id>/submit.
+
+Oba servisa moraju biti pokrenuta nad istim MongoDB/Redisom, npr.:
+    python main.py                                   (port 5001)
+    hypercorn asgi:app --bind 0.0.0.0:5002 --workers 1
+
+Pokretanje iz quiz_service direktorijuma:
+    python -m benchmarks.bench_async_service \
+        --target sync=http://localhost:5001 --target async=http://localhost:5002 \
+        --concurrency 200 --requests 5000
+
+/submit stavlja prave poslove u red ocjenjivanja (i salje mejl na user_email).
+Klijent koristi niti sa keep-alive sesijama; za vece brojeve ga treba pokrenuti
+na drugoj masini da ne dijeli CPU sa servisom.
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+_local = threading.local()
+
+
+def session() -> requests.Session:
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def run(call, total: int, concurrency: int):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            ok = call().status_code < 400
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return total / wall, percentile(latencies, 50) * 1000, percentile(latencies, 99) * 1000, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target", action="append", required=True, help="ime=http://host:port")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--quiz-id", help="objavljen kviz; podrazumijevano prvi sa /published")
+    args = parser.parse_args()
+
+    targets = [t.split("=", 1) for t in args.target]
+    first_url = targets[0][1].rstrip("/")
+
+    quiz_id = args.quiz_id
+    if not quiz_id:
+        published = requests.get(f"{first_url}/api/quizzes/published", params={"limit": 1}, timeout=10).json()
+        if not published:
+            raise SystemExit("No published quizzes, create and approve one or pass --quiz-id")
+        quiz_id = published[0]["_id"]
+
+    submission = {"answers": [{"question_index": 0, "selected": ["1"]}], "user_email": "bench@example.com", "time_spent": 10}
+
+    print(f"quiz {quiz_id}, {args.requests} requests per endpoint, concurrency {args.concurrency}")
+    print(f"{'target':<8} {'endpoint':<12} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'errors':>8}")
+
+    for name, url in targets:
+        base = f"{url.rstrip('/')}/api/quizzes"
+        endpoints = [
+            ("/published", lambda: session().get(f"{base}/published", timeout=30)),
+            ("/<id>", lambda: session().get(f"{base}/{quiz_id}", timeout=30)),
+            ("/submit", lambda: session().post(f"{base}/{quiz_id}/submit", json=submission, timeout=30)),
+        ]
+
+        for label, call in endpoints:
+            #zagrijavanje konekcija i kesa
+            run(call, min(args.concurrency, args.requests), args.concurrency)
+            rps, p50, p99, errors = run(call, args.requests, args.concurrency)
+            print(f"{name:<8} {label:<12} {rps:>10.0f} {p50:>10.1f} {p99:>10.1f} {errors:>8}")
+
+
+if __name__ == "__main__":
+    main()
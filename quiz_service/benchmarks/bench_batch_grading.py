@@ -0,0 +1,79 @@
+"""
+Poredjenje ocjenjivanja predaja jednu po jednu (grade_batch nad jednom
+predajom, kao pojedinacan posao u workeru) i grupnog ocjenjivanja svih
+predaja jednim pozivom grade_batch.
+
+Pokretanje iz quiz_service direktorijuma:
+    python -m benchmarks.bench_batch_grading --submissions 2000 --questions 50
+"""
+import argparse
+import random
+import time
+from Services.AnswerKeyCache import CompiledAnswerKey
+from Services.BatchGrading import build_key_matrix, grade_batch
+
+
+def make_quiz(questions: int, options: int) -> dict:
+    rnd = random.Random(1)
+    quiz = {"_id": "bench", "title": "Benchmark", "questions": []}
+    for q in range(questions):
+        opts = [f"q{q}_opt{o}" for o in range(options)]
+        correct = rnd.sample(opts, rnd.randint(1, 2))
+        quiz["questions"].append({"options": opts, "correct_answers": correct, "points": rnd.randint(1, 5)})
+    return quiz
+
+
+def make_submissions(quiz: dict, count: int) -> list:
+    rnd = random.Random(2)
+    submissions = []
+    for _ in range(count):
+        answers = []
+        for idx, q in enumerate(quiz["questions"]):
+            if rnd.random() < 0.95:
+                pick = q["correct_answers"] if rnd.random() < 0.6 else rnd.sample(q["options"], 1)
+                answers.append({"question_index": idx, "selected": list(pick)})
+        rnd.shuffle(answers)
+        submissions.append(answers)
+    return submissions
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--submissions", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--options", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    quiz = make_quiz(args.questions, args.options)
+    submissions = make_submissions(quiz, args.submissions)
+    answer_key = CompiledAnswerKey.from_quiz(quiz)
+    key_matrix = build_key_matrix(answer_key)
+
+    def one_by_one():
+        return [grade_batch(answer_key, [s], key_matrix) for s in submissions]
+
+    single = [int(graded["points"][0]) for graded in one_by_one()]
+    batch = grade_batch(answer_key, submissions, key_matrix)
+    assert single == [int(p) for p in batch["points"]], "batch and per-submission results differ"
+
+    per_submission = best_of(one_by_one, args.repeat)
+    batched = best_of(lambda: grade_batch(answer_key, submissions, key_matrix), args.repeat)
+
+    print(f"{args.submissions} submissions x {args.questions} questions x {args.options} options")
+    print(f"per-submission: {per_submission * 1000:8.2f} ms  ({args.submissions / per_submission:10.0f} subs/s)")
+    print(f"batch:          {batched * 1000:8.2f} ms  ({args.submissions / batched:10.0f} subs/s)")
+    print(f"speedup:        {per_submission / batched:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Mjerenje cijene odgovora /published na velikoj listi kvizova:
+  - stari cache hit: json.loads kesiranog stringa pa jsonify
+  - novi cache hit: spajanje sacuvanih JSON bajtova po kvizu
+  - jsonify sa Flask-ovim i sa FastJSONProvider-om (orjson)
+
+Pokretanje iz quiz_service direktorijuma:
+    python -m benchmarks.bench_json_encoding --quizzes 2000 --questions 20
+"""
+import argparse
+import json
+import time
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+from Extensions.JsonProvider import FastJSONProvider, dumps_bytes, orjson
+
+
+def make_quizzes(count: int, questions: int) -> list:
+    return [
+        {
+            "_id": f"{i:024x}",
+            "title": f"Kviz broj {i}",
+            "author_id": i % 50,
+            "duration": 600,
+            "status": "APPROVED",
+            "created_at": "2025-01-01T10:00:00Z",
+            "questions": [
+                {"text": f"Pitanje {q} za kviz {i}?", "options": [f"Opcija {o}" for o in range(4)], "points": 2}
+                for q in range(questions)
+            ]
+        }
+        for i in range(count)
+    ]
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quizzes", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    quizzes = make_quizzes(args.quizzes, args.questions)
+    cached_string = json.dumps(quizzes)
+    cached_entries = {q["_id"].encode(): dumps_bytes(q) for q in quizzes}
+
+    default_app = Flask("default")
+    default_app.json = DefaultJSONProvider(default_app)
+    fast_app = Flask("fast")
+    fast_app.json = FastJSONProvider(fast_app)
+
+    with default_app.test_request_context():
+        old_hit = best_of(lambda: jsonify(json.loads(cached_string)).get_data(), args.repeat)
+        default_encode = best_of(lambda: jsonify(quizzes).get_data(), args.repeat)
+
+    new_hit = best_of(
+        lambda: b"[" + b",".join(cached_entries[k] for k in sorted(cached_entries)) + b"]",
+        args.repeat
+    )
+
+    with fast_app.test_request_context():
+        fast_encode = best_of(lambda: jsonify(quizzes).get_data(), args.repeat)
+
+    size_mb = len(cached_string) / 1024 / 1024
+    print(f"{args.quizzes} quizzes x {args.questions} questions ({size_mb:.1f} MB JSON), orjson: {orjson is not None}")
+    print(f"cache hit, loads + jsonify: {old_hit * 1000:8.2f} ms")
+    print(f"cache hit, stored bytes:    {new_hit * 1000:8.2f} ms")
+    print(f"jsonify, default provider:  {default_encode * 1000:8.2f} ms")
+    print(f"jsonify, fast provider:     {fast_encode * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
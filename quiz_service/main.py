@@ -1,21 +1,112 @@
 import os
+import sys
+import click
+import signal
+import threading
+import pymongo
 from flask import Flask
 from flask_cors import CORS
 from dotenv import load_dotenv
-from WebAPI.routes import quiz_db
+from WebAPI.routes import quiz_db, published_cache, collection
+from Services.GradingWorkerPool import grading_pool
+from Extensions.JsonProvider import FastJSONProvider
+from Database.indexes import ensure_indexes, explain_route_queries, QUIZ_INDEXES, OBSOLETE_QUIZ_INDEXES, OUTCOME_INDEXES
+from Services.AnswerKeyCache import answer_key_cache
+from Services.ItemAnalytics import item_analytics
 
 load_dotenv()
 
-def create_quiz_app():
+MONGO_INDEX_TIMEOUT = float(os.getenv("MONGO_INDEX_TIMEOUT_SECONDS", 5))
+
+#grading pool se pokrece samo u jednom procesu; sa vise WSGI procesa (npr. gunicorn
+#"main:create_app()") postavlja se false i pool se pokrece sa run-grading-workers
+START_GRADING_WORKERS = os.getenv("START_GRADING_WORKERS", "true").lower() == "true"
+
+#CLI komande odmah javljaju nedostupan MongoDB umjesto da svaki upit ceka server selection timeout
+def mongo_available() -> bool:
+    try:
+        with pymongo.timeout(MONGO_INDEX_TIMEOUT):
+            collection.database.command("ping")
+        return True
+    except Exception as e:
+        print(f"MongoDB unavailable: {e}")
+        return False
+
+def create_quiz_app(start_workers=False, warm_up=True):
     app = Flask(__name__)
-    CORS(app)
+    app.json = FastJSONProvider(app)
+    CORS(app, expose_headers=["X-Next-Cursor"])
 
     app.register_blueprint(quiz_db, url_prefix="/api/quizzes")
 
+    #kratak rok, da nedostupan MongoDB ne zadrzi start za cijeli server selection timeout
+    try:
+        with pymongo.timeout(MONGO_INDEX_TIMEOUT):
+            ensure_indexes(collection, QUIZ_INDEXES, OBSOLETE_QUIZ_INDEXES)
+            ensure_indexes(item_analytics.outcomes, OUTCOME_INDEXES)
+    except Exception as e:
+        print(f"Creating MongoDB indexes failed: {e}")
+
+    #flask --app main check-query-plans
+    @app.cli.command("check-query-plans")
+    def check_query_plans():
+        if not mongo_available():
+            raise SystemExit(1)
+        scans = 0
+        for entry in explain_route_queries(collection):
+            if "error" in entry:
+                print(f"[ERROR]    {entry['route']}: {entry['error']}")
+                continue
+            flag = "COLLSCAN" if entry["collection_scan"] else "OK"
+            scans += entry["collection_scan"]
+            print(f"[{flag:8}] {entry['route']}: {' <- '.join(entry['stages'])}")
+        print(f"{scans} route quer{'y' if scans == 1 else 'ies'} with a collection scan")
+
+    #flask --app main rebuild-item-stats QUIZ_ID
+    @app.cli.command("rebuild-item-stats")
+    @click.argument("quiz_id")
+    def rebuild_item_stats(quiz_id):
+        if not mongo_available():
+            raise SystemExit(1)
+        answer_key = answer_key_cache.get(quiz_id)
+        if not answer_key:
+            print(f"Quiz {quiz_id} not found")
+            return
+        print(f"Item stats rebuilt from {item_analytics.rebuild(answer_key)} submission(s)")
+
+    #grading pool kao zaseban proces, npr. uz async servis sa vise hypercorn workera
+    #flask --app main run-grading-workers
+    @app.cli.command("run-grading-workers")
+    def run_grading_workers():
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        grading_pool.start()
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            grading_pool.stop()
+
+    if start_workers:
+        grading_pool.start()
+
+    #warm-up gradi samo proces koji dobije Redis lock
+    if warm_up:
+        try:
+            published_cache.warm_up()
+        except Exception as e:
+            print(f"Published quiz cache warm-up failed: {e}")
+
     return app
 
+#flask --app main <komanda> trazi create_app; CLI komande ne podizu grading workere ni kes
+def create_app():
+    return create_quiz_app(start_workers=False, warm_up=False)
+
 if __name__ == "__main__":
-    app = create_quiz_app()
+    #werkzeug reloader pokrece dva procesa, workere dizemo samo u onom koji servira zahtjeve
+    serving = os.environ.get("WERKZEUG_RUN_MAIN") == "true"
+    app = create_quiz_app(start_workers=serving and START_GRADING_WORKERS, warm_up=serving)
     port = int(os.getenv("SERVER_PORT", 5001))
     print(f"Quiz Service pokrenut na portu {port}")
     app.run(debug=True, port=port, host='0.0.0.0')
\ No newline at end of file
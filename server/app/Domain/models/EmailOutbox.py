@@ -0,0 +1,28 @@
+from app.Database.db import db
+from datetime import datetime
+
+class EmailOutbox(db.Model):
+    __tablename__ = "email_outbox"
+
+    PENDING = "PENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    #vrsta poruke odredjuje koju metodu EmailSender-a dispatcher poziva
+    kind = db.Column(db.String(30), nullable=False)
+    to_email = db.Column(db.String(120), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    attachment = db.Column(db.LargeBinary(length=(2**24) - 1), nullable=True)
+
+    status = db.Column(db.String(10), default=PENDING, nullable=False, index=True)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    last_error = db.Column(db.String(500), nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<EmailOutbox {self.id} {self.kind} -> {self.to_email}: {self.status}>"
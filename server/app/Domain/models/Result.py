@@ -3,6 +3,13 @@ from datetime import datetime
 
 class Result(db.Model):
     __tablename__ = "result"
+    __table_args__ = (
+        #istorija igraca (keyset po created_at) i rang lista/izvjestaji po kvizu
+        db.Index("ix_result_user_created", "user_id", "created_at"),
+        db.Index("ix_result_quiz_score", "quiz_id", "score"),
+        #kljuc idempotentnosti; na postojece baze ga dodaje create_missing_indexes
+        db.Index("uq_result_submission_id", "submission_id", unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -17,6 +24,9 @@ class Result(db.Model):
 
     time_spent = db.Column(db.Integer, nullable=True)
 
+    #kljuc idempotentnosti iz quiz servisa, ista predaja se ne upisuje dva puta
+    submission_id = db.Column(db.String(64), nullable=True)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
     #relacija sa user modelom
@@ -1,7 +1,7 @@
 from app.Database.db import db
 from app.Domain.enums.role import Role
 from datetime import datetime
-from app.Extensions.bcrypt import bcrypt
+from app.Extensions.password_hasher import password_hasher
 
 class User(db.Model):
     __tablename__ = "users"
@@ -31,7 +31,7 @@ class User(db.Model):
 
     
     def verify_password(self, password: str) -> bool:
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_hasher.verify(password, self.password_hash)
 
     def is_blocked(self) -> bool:
         if self.blocked_until is None:
@@ -0,0 +1,31 @@
+from app.Database.db import db
+from datetime import datetime
+
+class UserQuizStats(db.Model):
+    """
+    Zbirni podaci igraca po kvizu, azuriraju se pri svakom upisu rezultata
+    (ResultService), pa statistika ne skenira istoriju.
+    """
+    __tablename__ = "user_quiz_stats"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "quiz_id", name="uq_user_quiz_stats_user_quiz"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    quiz_id = db.Column(db.String(50), nullable=False)
+    quiz_title = db.Column(db.String(100), nullable=False)
+
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    percentage_sum = db.Column(db.Float, default=0.0, nullable=False)
+    best_score = db.Column(db.Integer, default=0, nullable=False)
+    best_percentage = db.Column(db.Float, default=0.0, nullable=False)
+
+    last_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    @property
+    def average_percentage(self) -> float:
+        return self.percentage_sum / self.attempts if self.attempts else 0.0
+
+    def __repr__(self):
+        return f"<UserQuizStats {self.user_id} - {self.quiz_id}: {self.attempts}>"
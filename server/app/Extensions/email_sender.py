@@ -1,18 +1,29 @@
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
 import os
+from app.Extensions.smtp_pool import SmtpConnectionPool
 
 class EmailSender:
     def __init__(self):
-        self.smtp_host = "smtp.gmail.com"
-        self.smtp_port = 587
+        self.smtp_host = os.getenv("SMTP_HOST", "smtp.gmail.com")
+        self.smtp_port = int(os.getenv("SMTP_PORT", 587))
         self.email_user = os.getenv("EMAIL_USER")
         self.email_pass = os.getenv("EMAIL_PASS")
         self.email_from = os.getenv("EMAIL_FROM", self.email_user)
 
+        #sesije se drze otvorene i koriste za vise poruka
+        self.pool = SmtpConnectionPool(
+            self.smtp_host,
+            self.smtp_port,
+            self.email_user,
+            self.email_pass,
+            use_tls=os.getenv("SMTP_STARTTLS", "true").lower() == "true",
+            max_sessions=int(os.getenv("SMTP_MAX_SESSIONS", 2)),
+            idle_timeout=int(os.getenv("SMTP_IDLE_TIMEOUT", 60))
+        )
+
     def send_role_change_email(self, to_email: str, new_role: str, full_name: str):
         
         """
@@ -35,10 +46,7 @@ class EmailSender:
 
         msg.attach(MIMEText(body, "html"))
 
-        with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-            server.starttls()
-            server.login(self.email_user, self.email_pass)
-            server.send_message(msg)
+        self.pool.send(msg)
 
     def send_quiz_result_email(self, to_email, quiz_title, score, total, percentage):
         subject= f"Quiz result: {quiz_title}"
@@ -58,10 +66,7 @@ class EmailSender:
         msg.attach(MIMEText(body, "html"))
 
         try:
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.email_user, self.email_pass)
-                server.send_message(msg)
+            self.pool.send(msg)
         except Exception as e:
             print(f"Error sending mail: {e}")
             
@@ -80,7 +85,4 @@ class EmailSender:
         part.add_header("Content-Disposition", f'attachment; filename="{filename}"')
         msg.attach(part)
 
-        with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-            server.starttls()
-            server.login(self.email_user, self.email_pass)
-            server.send_message(msg)
\ No newline at end of file
+        self.pool.send(msg)
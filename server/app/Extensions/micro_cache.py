@@ -0,0 +1,74 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+        self.stale = False
+
+
+class MicroCache:
+    """
+    Kratkotrajni kes u memoriji procesa sa single-flight ucitavanjem:
+    istovremeni promasaji za isti kljuc cekaju jedan poziv loader-a
+    umjesto da svaki ode do quiz_service-a.
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, loader):
+        """
+        loader vraca (vrijednost, da li se smije kesirati).
+        Greska loader-a se prosljedjuje i svima koji su cekali isti poziv.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                return entry[1]
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        cacheable = False
+        try:
+            value, cacheable = loader()
+            flight.value = value
+            return value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                #invalidacija tokom ucitavanja znaci da je odgovor mozda vec zastario
+                if flight.error is None and cacheable and not flight.stale:
+                    self._entries[key] = (time.monotonic() + self.ttl, flight.value)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+            flight.event.set()
+
+    def invalidate(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            flight = self._inflight.get(key)
+            if flight is not None:
+                flight.stale = True
@@ -0,0 +1,83 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt as _bcrypt
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Red za hesiranje je pun, klijent treba pokusati kasnije.
+    """
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Too many password operations in progress")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """
+    bcrypt hesiranje i provjera lozinki u ogranicenom pool-u procesa, tako da
+    spora bcrypt racunanja ne drze GIL niti web servera. Broj poslova koji
+    cekaju je ogranicen (max_pending); preko toga se odmah baca PasswordHasherBusy.
+
+    Cost (BCRYPT_ROUNDS) se moze mijenjati: hesevi sa drugim cost-om se
+    prepoznaju preko needs_rehash i presiflaju pri sljedecem loginu.
+    Sa PASSWORD_HASH_WORKERS=0 sve se racuna u niti zahtjeva.
+    """
+
+    def __init__(self, workers=None, max_pending=None, rounds=None, wait_seconds=None):
+        self.workers = workers if workers is not None else int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+        self.rounds = rounds or int(os.getenv("BCRYPT_ROUNDS", 12))
+        self.wait_seconds = wait_seconds if wait_seconds is not None else float(os.getenv("PASSWORD_HASH_WAIT_SECONDS", 0.2))
+        max_pending = max_pending or int(os.getenv("PASSWORD_HASH_MAX_PENDING", max(self.workers, 1) * 8))
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._executor
+
+    def _run(self, fn, *args):
+        if self.workers == 0:
+            return fn(*args)
+
+        if not self._slots.acquire(timeout=self.wait_seconds):
+            raise PasswordHasherBusy()
+        try:
+            #nit zahtjeva ceka bez GIL-a dok proces racuna
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        salt = _bcrypt.gensalt(self.rounds)
+        return self._run(_bcrypt.hashpw, password.encode("utf-8"), salt).decode("utf-8")
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        try:
+            return self._run(_bcrypt.checkpw, password.encode("utf-8"), password_hash.encode("utf-8"))
+        except ValueError:
+            #neispravan hes u bazi
+            return False
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        try:
+            return int(password_hash.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
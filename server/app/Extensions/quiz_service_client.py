@@ -0,0 +1,222 @@
+import os
+import time
+import threading
+from bisect import bisect_left
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class LatencyHistogram:
+    """
+    Histogram trajanja poziva po ruti (fiksni bucket-i u milisekundama).
+    """
+
+    BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, route: str, elapsed_ms: float) -> None:
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = {"count": 0, "sum_ms": 0.0, "buckets": [0] * (len(self.BUCKETS_MS) + 1)}
+            entry["count"] += 1
+            entry["sum_ms"] += elapsed_ms
+            entry["buckets"][bisect_left(self.BUCKETS_MS, elapsed_ms)] += 1
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{b}" for b in self.BUCKETS_MS] + ["le_inf"]
+        with self._lock:
+            return {
+                route: {
+                    "count": entry["count"],
+                    "avg_ms": round(entry["sum_ms"] / entry["count"], 2),
+                    "buckets": dict(zip(labels, entry["buckets"]))
+                }
+                for route, entry in self._routes.items()
+            }
+
+
+class UpstreamUnavailable(Exception):
+    """
+    Poziv nije ni poslat: prekidac je otvoren ili je bulkhead pun.
+    """
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    CLOSED -> OPEN nakon failure_threshold uzastopnih gresaka ili sporih poziva.
+    OPEN odbija pozive dok ne istekne reset_timeout, zatim HALF_OPEN pusta
+    jedan probni poziv: uspjeh zatvara prekidac, greska ga ponovo otvara.
+    """
+
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __init__(self, failure_threshold=5, reset_timeout=10.0, slow_call_seconds=5.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.slow_call_seconds = slow_call_seconds
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def _retry_after(self) -> int:
+        remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+        return max(1, int(remaining + 0.999))
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise UpstreamUnavailable("Quiz Service circuit is open", self._retry_after())
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self._state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    raise UpstreamUnavailable("Quiz Service circuit is half-open", 1)
+                self._probe_in_flight = True
+
+    def cancel_call(self) -> None:
+        #poziv odobren u before_call nije poslat, half-open mora moci pustiti sljedeci probni
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record(self, success: bool, elapsed: float) -> None:
+        failed = not success or elapsed >= self.slow_call_seconds
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probe_in_flight = False
+                if failed:
+                    self._trip()
+                else:
+                    self._state = self.CLOSED
+                    self._failures = 0
+                return
+
+            if not failed:
+                self._failures = 0
+                return
+
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._trip()
+
+    def _trip(self) -> None:
+        if self._state == self.CLOSED:
+            print(f"Quiz Service circuit opened after {self._failures} failure(s)")
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._failures = 0
+
+
+class QuizServiceClient:
+    """
+    HTTP klijent prema quiz_service-u nad jednom requests.Session:
+    - keep-alive pool konekcija umjesto nove TCP konekcije po zahtjevu
+    - connect/read timeout na svakom pozivu
+    - ponavljanje sa backoff-om i jitter-om samo za idempotentne metode
+      (POST/PATCH se ponavljaju jedino kad konekcija nije ni uspostavljena)
+    - circuit breaker: kad quiz_service ne odgovara, pozivi odmah padaju
+    - bulkhead: najvise max_concurrency istovremenih poziva, da spor quiz_service
+      ne zauzme sve niti gateway-a (login i ostali endpointi ostaju dostupni)
+    """
+
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+    def __init__(self, base_url=None, pool_size=None, connect_timeout=None, read_timeout=None, retries=None,
+                 max_concurrency=None, breaker=None):
+        self.base_url = (base_url or os.getenv("QUIZ_SERVICE_URL", "http://localhost:5001/api/quizzes")).rstrip("/")
+        self.timeout = (
+            connect_timeout or float(os.getenv("QUIZ_SERVICE_CONNECT_TIMEOUT", 2)),
+            read_timeout or float(os.getenv("QUIZ_SERVICE_READ_TIMEOUT", 10))
+        )
+        pool_size = pool_size or int(os.getenv("QUIZ_SERVICE_POOL_SIZE", 20))
+        retries = retries if retries is not None else int(os.getenv("QUIZ_SERVICE_RETRIES", 2))
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            allowed_methods=self.IDEMPOTENT_METHODS,
+            status_forcelist=(502, 503, 504),
+            backoff_factor=0.1,
+            backoff_jitter=0.1,
+            raise_on_status=False,
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.latency = LatencyHistogram()
+
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=int(os.getenv("QUIZ_SERVICE_BREAKER_FAILURES", 5)),
+            reset_timeout=float(os.getenv("QUIZ_SERVICE_BREAKER_RESET_SECONDS", 10)),
+            slow_call_seconds=float(os.getenv("QUIZ_SERVICE_SLOW_CALL_SECONDS", 5))
+        )
+        self._bulkhead = threading.BoundedSemaphore(
+            max_concurrency or int(os.getenv("QUIZ_SERVICE_MAX_CONCURRENCY", 16))
+        )
+        self.bulkhead_wait = float(os.getenv("QUIZ_SERVICE_BULKHEAD_WAIT_SECONDS", 0.5))
+
+    def request(self, method: str, path: str, route: str | None = None, **kwargs):
+        """
+        path je relativan u odnosu na base_url, route je oznaka za histogram
+        (npr. "GET /<quiz_id>") da se ID-jevi ne bi mijesali u metrike.
+        Baca UpstreamUnavailable ako je prekidac otvoren ili je bulkhead pun.
+        Kod stream=True bulkhead se oslobadja cim stignu zaglavlja.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        route = route or f"{method} {path}"
+
+        self.breaker.before_call()
+        if not self._bulkhead.acquire(timeout=self.bulkhead_wait):
+            self.breaker.cancel_call()
+            raise UpstreamUnavailable("Too many concurrent Quiz Service calls", 1)
+
+        started = time.perf_counter()
+        success = False
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+            success = response.status_code < 500
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            self._bulkhead.release()
+            self.breaker.record(success, elapsed)
+            self.latency.observe(route, elapsed * 1000)
+
+    def get(self, path: str, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def patch(self, path: str, **kwargs):
+        return self.request("PATCH", path, **kwargs)
+
+    def delete(self, path: str, **kwargs):
+        return self.request("DELETE", path, **kwargs)
+
+
+quiz_service_client = QuizServiceClient()
@@ -0,0 +1,17 @@
+import os
+import redis
+
+redis_client = redis.Redis(
+    host=os.getenv("REDIS_HOST", "redis_cache"),
+    port=int(os.getenv("REDIS_PORT", 6379)),
+    db=0,
+    decode_responses=True
+)
+
+#za binarne vrijednosti (npr. kesirani PDF izvjestaji) koje se ne smiju dekodirati
+redis_binary_client = redis.Redis(
+    host=os.getenv("REDIS_HOST", "redis_cache"),
+    port=int(os.getenv("REDIS_PORT", 6379)),
+    db=0,
+    decode_responses=False
+)
@@ -0,0 +1,88 @@
+import time
+import smtplib
+import threading
+
+
+class SmtpConnectionPool:
+    """
+    Pool autentifikovanih SMTP sesija. Sesija se otvara (connect + STARTTLS +
+    login) jednom i koristi za vise poruka; sesija koja je predugo stajala se
+    zatvara, a prekinuta veza se transparentno obnavlja. Broj istovremenih
+    sesija je ogranicen sa max_sessions.
+    """
+
+    def __init__(self, host, port, user=None, password=None, use_tls=True,
+                 max_sessions=2, idle_timeout=60, timeout=30):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_sessions)
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            conn.starttls()
+        if self.user:
+            conn.login(self.user, self.password)
+        return conn
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.quit()
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _checkout(self):
+        with self._lock:
+            while self._idle:
+                conn, last_used = self._idle.pop()
+                if time.monotonic() - last_used < self.idle_timeout:
+                    return conn
+                self._close(conn)
+        return self._connect()
+
+    def _checkin(self, conn):
+        with self._lock:
+            self._idle.append((conn, time.monotonic()))
+
+    def send(self, msg) -> None:
+        """
+        Salje poruku kroz slobodnu sesiju. Samo ako je server u medjuvremenu
+        prekinuo vezu (npr. zbog neaktivnosti) poruka se salje jos jednom kroz
+        novu sesiju. Odbijena poruka i timeout (poruka je mozda vec isporucena)
+        se prosljedjuju pozivaocu bez ponovnog slanja.
+        """
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._checkout()
+            try:
+                conn.send_message(msg)
+            except (smtplib.SMTPServerDisconnected, ConnectionResetError, BrokenPipeError):
+                self._close(conn)
+                conn = None
+                conn = self._connect()
+                conn.send_message(msg)
+            self._checkin(conn)
+        except Exception:
+            if conn is not None:
+                self._close(conn)
+            raise
+        finally:
+            self._slots.release()
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._close(conn)
@@ -1,15 +1,30 @@
 # app/Middleware/role_required.py
 
 from functools import wraps
-from flask_jwt_extended import verify_jwt_in_request, get_jwt
-from flask import jsonify
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
+from flask import jsonify, g
 from app.Domain.enums.role import Role
+from app.Services.UserIdentityCache import user_identity_cache
+
+def current_identity():
+    """
+    Korisnik iz JWT-a (UserIdentity) preko kesa identiteta, bez upita ka bazi
+    kad je u kesu. Pamti se u flask.g za trajanje zahtjeva; None ako korisnik
+    vise ne postoji.
+    """
+    if "current_identity" not in g:
+        g.current_identity = user_identity_cache.get(get_jwt_identity())
+    return g.current_identity
 
 def role_required(*roles: Role):
     """
     Dekorator za kontrolu pristupa na osnovu role.
-    U JWT-u se očekuje polje "role" koje dolazi iz tokena.
+    U JWT-u se očekuje polje "role" koje dolazi iz tokena. Potpisani claim
+    odbija zahtjev bez pristupa bazi, a uloga se zatim provjerava i preko
+    kesa identiteta, jer se mogla promijeniti nakon izdavanja tokena.
     """
+    allowed = [r.value if isinstance(r, Role) else r for r in roles]
+
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
@@ -18,11 +33,15 @@ def role_required(*roles: Role):
                 claims = get_jwt()
                 user_role = claims.get("role")
 
-                if user_role not in [r.value if isinstance(r, Role) else r for r in roles]:
+                if user_role not in allowed:
+                    return jsonify({"message": "Access denied: insufficient role"}), 403
+
+                identity = current_identity()
+                if identity is None or identity.role not in allowed:
                     return jsonify({"message": "Access denied: insufficient role"}), 403
             except Exception as e:
                 return jsonify({"message": f"Authentication failed: {str(e)}"}), 401
 
             return fn(*args, **kwargs)
         return decorator
-    return wrapper
\ No newline at end of file
+    return wrapper
@@ -2,6 +2,8 @@ from flask_jwt_extended import create_access_token
 from app.Domain.models.User import User
 from datetime import datetime, timedelta
 from app.Database.db import db
+from app.Extensions.password_hasher import password_hasher, PasswordHasherBusy
+from app.Services.LoginThrottle import login_throttle
 
 class AuthResult:
     SUCCESS = "SUCCESS"
@@ -9,30 +11,69 @@ class AuthResult:
     BLOCKED = "BLOCKED"
 
 class AuthService:
-    def login(self, user: User | None, password: str):
-        
+    def login(self, user: User | None, password: str, email: str | None = None, client_ip: str | None = None):
+        email = email or (user.email if user else None)
+
+        #brojaci i blokade su u Redisu; bez Redisa vazi stari nacin preko kolona u users tabeli
+        throttled = True
+        try:
+            if login_throttle.blocked_for(email, client_ip):
+                return AuthResult.BLOCKED, None
+        except Exception as e:
+            print(f"Login throttle unavailable, using database counters: {e}")
+            throttled = False
+
         #ako user ne postoji
         if user is None:
+            if throttled:
+                self._register_failure(email, client_ip)
             return AuthResult.INVALID_CREDENTIALS, None
-        
+
         #ako je user blokiran
         if user.blocked_until and user.blocked_until > datetime.utcnow():
             return AuthResult.BLOCKED, None
-        
+
         #pogresna lozinka
         if not user.verify_password(password):
+            if throttled:
+                self._register_failure(email, client_ip)
+                return AuthResult.INVALID_CREDENTIALS, None
+
             user.failed_attempts += 1
 
             if user.failed_attempts >= 3:
                 user.blocked_until = datetime.utcnow() + timedelta(minutes=1)
                 user.failed_attempts = 0
-        
+
             db.session.commit()
             return AuthResult.INVALID_CREDENTIALS, None
-        
-        user.failed_attempts = 0
-        user.blocked_until = None
-        db.session.commit()
+
+        if throttled:
+            try:
+                login_throttle.reset(email)
+            except Exception as e:
+                print(f"Login throttle reset failed: {e}")
+
+        #u bazu se pise samo ako se stanje zaista mijenja
+        changed = False
+        if user.failed_attempts:
+            user.failed_attempts = 0
+            changed = True
+        if user.blocked_until is not None:
+            user.blocked_until = None
+            changed = True
+
+        #BCRYPT_ROUNDS je promijenjen, lozinka se presifruje dok je imamo u cistom obliku;
+        #ako je pool za hesiranje pun, presifruje se pri nekoj od sljedecih prijava
+        if password_hasher.needs_rehash(user.password_hash):
+            try:
+                user.password_hash = password_hasher.hash(password)
+                changed = True
+            except PasswordHasherBusy as e:
+                print(f"Password rehash for user {user.id} skipped: {e}")
+
+        if changed:
+            db.session.commit()
 
         print(">>> user.id =", user.id, type(user.id))
         print(">>> user.role =", user.role)
@@ -42,4 +83,10 @@ class AuthService:
             additional_claims={"role": user.role.value}
         )
 
-        return AuthResult.SUCCESS, token
\ No newline at end of file
+        return AuthResult.SUCCESS, token
+
+    def _register_failure(self, email, client_ip):
+        try:
+            login_throttle.register_failure(email, client_ip)
+        except Exception as e:
+            print(f"Login throttle unavailable: {e}")
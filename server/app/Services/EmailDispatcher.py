@@ -0,0 +1,98 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from app.Database.db import db
+from app.Domain.models.EmailOutbox import EmailOutbox
+from app.Extensions.email_sender import EmailSender
+
+
+class EmailDispatcher:
+    """
+    Outbox za email poruke. HTTP zahtjev samo upisuje red u tabelu
+    email_outbox, a pozadinska nit salje poruke i ponavlja neuspjele
+    pokusaje sa eksponencijalnim odlaganjem.
+    """
+
+    def __init__(self):
+        self.batch_size = int(os.getenv("EMAIL_OUTBOX_BATCH", 20))
+        self.poll_interval = float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", 5))
+        self.max_attempts = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", 6))
+        self.backoff_base = float(os.getenv("EMAIL_OUTBOX_BACKOFF_SECONDS", 10))
+        self.backoff_max = float(os.getenv("EMAIL_OUTBOX_BACKOFF_MAX_SECONDS", 3600))
+        self.sender = EmailSender()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def enqueue(self, kind: str, to_email: str, payload: dict, attachment: bytes | None = None) -> EmailOutbox:
+        entry = EmailOutbox(kind=kind, to_email=to_email, payload=payload, attachment=attachment)
+        db.session.add(entry)
+        try:
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise e
+
+        self._wakeup.set()
+        return entry
+
+    def start(self, app):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, args=(app,), name="email-dispatcher", daemon=True)
+        self._thread.start()
+
+    def _run(self, app):
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+            try:
+                with app.app_context():
+                    #saljemo dok ima dospjelih poruka, pa tek onda cekamo
+                    while self.dispatch_pending() == self.batch_size:
+                        pass
+            except Exception as e:
+                print(f"Email dispatcher error: {e}")
+
+    def dispatch_pending(self) -> int:
+        entries = (
+            EmailOutbox.query
+            .filter(EmailOutbox.status == EmailOutbox.PENDING)
+            .filter(EmailOutbox.next_attempt_at <= datetime.utcnow())
+            .order_by(EmailOutbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+        for entry in entries:
+            try:
+                self._send(entry)
+                entry.status = EmailOutbox.SENT
+                entry.sent_at = datetime.utcnow()
+                entry.attachment = None
+            except Exception as e:
+                entry.attempts += 1
+                entry.last_error = str(e)[:500]
+                if entry.attempts >= self.max_attempts:
+                    entry.status = EmailOutbox.FAILED
+                    print(f"Email {entry.id} to {entry.to_email} failed permanently: {e}")
+                else:
+                    delay = min(self.backoff_base * (2 ** (entry.attempts - 1)), self.backoff_max)
+                    entry.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+
+        db.session.commit()
+        return len(entries)
+
+    def _send(self, entry: EmailOutbox):
+        payload = entry.payload or {}
+
+        if entry.kind == "role_change":
+            self.sender.send_role_change_email(to_email=entry.to_email, **payload)
+        elif entry.kind == "pdf_report":
+            self.sender.send_pdf_report(to_email=entry.to_email, pdf_bytes=entry.attachment, **payload)
+        else:
+            raise ValueError(f"Unknown email kind: {entry.kind}")
+
+
+email_dispatcher = EmailDispatcher()
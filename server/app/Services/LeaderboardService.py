@@ -0,0 +1,163 @@
+import os
+import json
+from app.Database.db import db
+from app.Domain.models.Result import Result
+from app.Domain.models.User import User
+from app.Extensions.redis_ext import redis_client
+
+
+class LeaderboardService:
+    """
+    Rang lista po kvizu u Redis ZSET-u (clan = user_id, najbolji pokusaj).
+    Skor kodira bodove i vrijeme: vise bodova je bolje, a za iste bodove
+    krace vrijeme, pa ZADD GT cuva najbolji pokusaj, a top-K i rang
+    igraca su O(log n). Imena za prikaz su u jednom hash-u (user_id -> JSON).
+    Kviz ciji ZSET jos nije izgradjen iz MySQL-a se gradi pri prvom citanju.
+    """
+
+    KEY_PREFIX = "leaderboard:"
+    READY_KEY = "leaderboard:ready"
+    NAMES_KEY = "leaderboard:names"
+
+    #vrijeme u sekundama zauzima donjih 6 cifara skora
+    TIME_SCALE = 10 ** 6
+    MAX_TIME = TIME_SCALE - 1
+
+    def __init__(self, client=None):
+        self.redis = client or redis_client
+        self.rebuild_batch = int(os.getenv("LEADERBOARD_REBUILD_BATCH", 1000))
+
+    def _key(self, quiz_id) -> str:
+        return f"{self.KEY_PREFIX}{quiz_id}"
+
+    @classmethod
+    def encode(cls, score: int, time_spent) -> int:
+        time_spent = cls.MAX_TIME if time_spent is None else min(max(int(time_spent), 0), cls.MAX_TIME)
+        return int(score) * cls.TIME_SCALE + (cls.MAX_TIME - time_spent)
+
+    @classmethod
+    def decode(cls, value: float):
+        value = int(value)
+        time_spent = cls.MAX_TIME - value % cls.TIME_SCALE
+        return value // cls.TIME_SCALE, (None if time_spent == cls.MAX_TIME else time_spent)
+
+    @staticmethod
+    def _display(user) -> str:
+        return json.dumps({"full_name": user.get_full_name(), "email": user.email})
+
+    def record_results(self, results: list, users: dict) -> None:
+        """
+        results su sacuvani Result redovi, users je {user_id: User}.
+        """
+        if not results:
+            return
+
+        pipe = self.redis.pipeline(transaction=False)
+        for res in results:
+            pipe.zadd(self._key(res.quiz_id), {str(res.user_id): self.encode(res.score, res.time_spent)}, gt=True)
+        names = {str(uid): self._display(u) for uid, u in users.items()}
+        if names:
+            pipe.hset(self.NAMES_KEY, mapping=names)
+        pipe.execute()
+
+    def update_display_name(self, user) -> None:
+        if self.redis.hexists(self.NAMES_KEY, str(user.id)):
+            self.redis.hset(self.NAMES_KEY, str(user.id), self._display(user))
+
+    def remove_user(self, user_id) -> None:
+        quiz_ids = [row[0] for row in db.session.query(Result.quiz_id).filter(Result.user_id == user_id).distinct()]
+        pipe = self.redis.pipeline(transaction=False)
+        for quiz_id in quiz_ids:
+            pipe.zrem(self._key(quiz_id), str(user_id))
+        pipe.hdel(self.NAMES_KEY, str(user_id))
+        pipe.execute()
+
+    def rebuild(self, quiz_id=None, reset: bool = True) -> int:
+        """
+        Gradi rang liste iz MySQL-a (jedan kviz ili sve). Vraca broj obradjenih rezultata.
+        Sa reset=False postojeci ZSET se ne brise nego dopunjuje (ZADD GT), pa
+        se ne gube rezultati upisani tokom gradnje.
+        """
+        query = (
+            db.session.query(Result.quiz_id, Result.user_id, Result.score, Result.time_spent,
+                             User.first_name, User.last_name, User.email)
+            .join(User, User.id == Result.user_id)
+        )
+        if quiz_id is not None:
+            query = query.filter(Result.quiz_id == str(quiz_id))
+
+        quiz_ids = {str(quiz_id)} if quiz_id is not None else set()
+        processed = 0
+        pipe = self.redis.pipeline(transaction=False)
+        if reset and quiz_id is not None:
+            pipe.delete(self._key(quiz_id))
+        elif reset:
+            for key in self.redis.scan_iter(match=f"{self.KEY_PREFIX}*"):
+                if key not in (self.READY_KEY, self.NAMES_KEY):
+                    pipe.delete(key)
+            pipe.delete(self.READY_KEY)
+
+        for row in query.yield_per(self.rebuild_batch):
+            quiz_ids.add(row.quiz_id)
+            pipe.zadd(self._key(row.quiz_id), {str(row.user_id): self.encode(row.score, row.time_spent)}, gt=True)
+            pipe.hset(self.NAMES_KEY, str(row.user_id), json.dumps({
+                "full_name": f"{row.first_name} {row.last_name}",
+                "email": row.email
+            }))
+            processed += 1
+            if processed % self.rebuild_batch == 0:
+                pipe.execute()
+
+        if quiz_ids:
+            pipe.sadd(self.READY_KEY, *quiz_ids)
+        pipe.execute()
+        return processed
+
+    def _ensure(self, quiz_id) -> None:
+        if not self.redis.sismember(self.READY_KEY, str(quiz_id)):
+            self.rebuild(quiz_id, reset=False)
+
+    def _names(self, user_ids: list) -> list:
+        if not user_ids:
+            return []
+        return [json.loads(raw) if raw else {} for raw in self.redis.hmget(self.NAMES_KEY, user_ids)]
+
+    def top(self, quiz_id, limit: int) -> list:
+        self._ensure(quiz_id)
+        members = self.redis.zrevrange(self._key(quiz_id), 0, limit - 1, withscores=True)
+
+        entries = []
+        for (user_id, value), names in zip(members, self._names([m for m, _ in members])):
+            score, time_spent = self.decode(value)
+            entries.append({
+                "user_id": int(user_id),
+                "full_name": names.get("full_name"),
+                "email": names.get("email"),
+                "score": score,
+                "time_spent": time_spent
+            })
+        return entries
+
+    def rank(self, quiz_id, user_id):
+        self._ensure(quiz_id)
+        key = self._key(quiz_id)
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zrevrank(key, str(user_id))
+        pipe.zscore(key, str(user_id))
+        pipe.zcard(key)
+        rank, value, total = pipe.execute()
+        if rank is None:
+            return None
+
+        score, time_spent = self.decode(value)
+        return {
+            "user_id": int(user_id),
+            "rank": rank + 1,
+            "score": score,
+            "time_spent": time_spent,
+            "total_players": total
+        }
+
+
+leaderboard_service = LeaderboardService()
@@ -0,0 +1,75 @@
+import os
+from app.Extensions.redis_ext import redis_client
+
+
+class LoginThrottle:
+    """
+    Brojaci neuspjelih prijava i blokade u Redisu, po email-u i po IP adresi.
+    Svaki neuspjeh radi INCR + EXPIRE u jednoj transakciji; rok se produzava
+    pri svakom neuspjehu (klizni prozor), pa brojac nestaje tek kad prodje
+    cijeli prozor bez neuspjelih pokusaja. Prekoracenje postavlja kljuc
+    blokade sa TTL-om. Nista od ovoga ne pise u MySQL.
+    """
+
+    FAIL_PREFIX = "login:fail:"
+    BLOCK_PREFIX = "login:block:"
+
+    def __init__(self, client=None):
+        self.redis = client or redis_client
+        self.max_attempts = int(os.getenv("LOGIN_MAX_ATTEMPTS", 3))
+        self.window_seconds = int(os.getenv("LOGIN_WINDOW_SECONDS", 300))
+        self.block_seconds = int(os.getenv("LOGIN_BLOCK_SECONDS", 60))
+        self.ip_max_attempts = int(os.getenv("LOGIN_IP_MAX_ATTEMPTS", 20))
+        self.ip_window_seconds = int(os.getenv("LOGIN_IP_WINDOW_SECONDS", 300))
+
+    @staticmethod
+    def _subjects(email: str | None, client_ip: str | None) -> list:
+        subjects = []
+        if email:
+            subjects.append(f"email:{email.strip().lower()}")
+        if client_ip:
+            subjects.append(f"ip:{client_ip}")
+        return subjects
+
+    def blocked_for(self, email: str | None, client_ip: str | None) -> int:
+        """
+        Vraca broj sekundi do isteka blokade (0 ako nije blokirano).
+        """
+        subjects = self._subjects(email, client_ip)
+        if not subjects:
+            return 0
+
+        pipe = self.redis.pipeline(transaction=False)
+        for subject in subjects:
+            pipe.ttl(self.BLOCK_PREFIX + subject)
+        return max(0, *pipe.execute())
+
+    def register_failure(self, email: str | None, client_ip: str | None) -> None:
+        limits = {}
+        pipe = self.redis.pipeline(transaction=True)
+        for subject in self._subjects(email, client_ip):
+            if subject.startswith("ip:"):
+                limits[subject] = (self.ip_max_attempts, self.ip_window_seconds)
+            else:
+                limits[subject] = (self.max_attempts, self.window_seconds)
+            pipe.incr(self.FAIL_PREFIX + subject)
+            pipe.expire(self.FAIL_PREFIX + subject, limits[subject][1])
+
+        if not limits:
+            return
+        counts = pipe.execute()[::2]
+
+        for (subject, (max_attempts, _)), count in zip(limits.items(), counts):
+            if count >= max_attempts:
+                pipe = self.redis.pipeline(transaction=True)
+                pipe.set(self.BLOCK_PREFIX + subject, 1, ex=self.block_seconds)
+                pipe.delete(self.FAIL_PREFIX + subject)
+                pipe.execute()
+
+    def reset(self, email: str | None) -> None:
+        #uspjesna prijava brise samo brojac za email, IP brojac i dalje vazi
+        if email:
+            self.redis.delete(self.FAIL_PREFIX + f"email:{email.strip().lower()}")
+
+
+login_throttle = LoginThrottle()
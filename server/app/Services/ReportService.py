@@ -0,0 +1,196 @@
+import os
+import json
+import uuid
+import threading
+from io import BytesIO
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, Future
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+from reportlab.pdfgen import canvas
+from app.Database.db import db
+from app.Domain.models.Result import Result
+from app.Extensions.redis_ext import redis_client, redis_binary_client
+from app.Services.EmailDispatcher import email_dispatcher
+
+
+class ReportService:
+    """
+    PDF izvjestaji po kvizu kao pozadinski posao. Zahtjev samo upisuje status
+    posla u Redis i vraca job_id, a PDF se pravi u malom pool-u niti i salje
+    kroz email outbox.
+
+    Gotov PDF se kesira pod kljucem (quiz_id, broj rezultata, posljednji id):
+    rezultati se samo dodaju, pa isti kljuc znaci isti sadrzaj i ponovljeni
+    zahtjev za nepromijenjen kviz se zavrsava odmah, bez citanja rezultata.
+    """
+
+    JOB_PREFIX = "report:job:"
+    PDF_PREFIX = "report:pdf:"
+    STATUS_TTL = 24 * 3600
+
+    def __init__(self, client=None, binary_client=None):
+        self.redis = client or redis_client
+        self.binary = binary_client or redis_binary_client
+        self.workers = int(os.getenv("REPORT_WORKERS", 2))
+        self.chunk_size = int(os.getenv("REPORT_CHUNK_SIZE", 500))
+        self.cache_ttl = int(os.getenv("REPORT_CACHE_TTL", 24 * 3600))
+        self._executor = None
+        self._lock = threading.Lock()
+        #isti izvjestaj koji se upravo pravi se ne pravi drugi put
+        self._building = {}
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pdf-report")
+        return self._executor
+
+    def set_status(self, job_id: str, fields: dict) -> None:
+        key = self.JOB_PREFIX + job_id
+        pipe = self.redis.pipeline()
+        pipe.hset(key, mapping={k: json.dumps(v) for k, v in fields.items()})
+        pipe.expire(key, self.STATUS_TTL)
+        pipe.execute()
+
+    def get_status(self, job_id: str):
+        record = self.redis.hgetall(self.JOB_PREFIX + job_id)
+        if not record:
+            return None
+        return {k: json.loads(v) for k, v in record.items()}
+
+    @staticmethod
+    def snapshot(quiz_id) -> tuple:
+        #jedan agregatni upit nad indeksom (quiz_id, score)
+        count, last_id = (
+            db.session.query(db.func.count(Result.id), db.func.max(Result.id))
+            .filter(Result.quiz_id == str(quiz_id))
+            .one()
+        )
+        return count, last_id or 0
+
+    def cache_key(self, quiz_id, count: int, last_id: int) -> str:
+        return f"{self.PDF_PREFIX}{quiz_id}:{count}:{last_id}"
+
+    def submit(self, quiz_id, to_email: str, requested_by) -> dict:
+        """
+        Vraca status posla. Ako je PDF za trenutno stanje kviza vec u kesu,
+        email se odmah stavlja u outbox i posao je zavrsen ("done").
+        """
+        job_id = uuid.uuid4().hex
+        count, last_id = self.snapshot(quiz_id)
+        key = self.cache_key(quiz_id, count, last_id)
+
+        record = {
+            "job_id": job_id,
+            "quiz_id": str(quiz_id),
+            "requested_by": requested_by,
+            "result_count": count,
+            "created_at": datetime.utcnow().isoformat()
+        }
+
+        pdf_bytes = self.binary.get(key)
+        if pdf_bytes is not None:
+            self._send(quiz_id, to_email, pdf_bytes)
+            record.update({"status": "done", "cached": True, "size": len(pdf_bytes)})
+            self.set_status(job_id, record)
+            return record
+
+        record["status"] = "queued"
+        self.set_status(job_id, record)
+        app = current_app._get_current_object()
+        self._get_executor().submit(self._run, app, job_id, quiz_id, to_email, key, last_id)
+        return record
+
+    def _run(self, app, job_id, quiz_id, to_email, key, last_id):
+        with app.app_context():
+            try:
+                self.set_status(job_id, {"status": "running"})
+                pdf_bytes, cached = self._build_once(quiz_id, key, last_id)
+                self._send(quiz_id, to_email, pdf_bytes)
+                self.set_status(job_id, {
+                    "status": "done",
+                    "cached": cached,
+                    "size": len(pdf_bytes),
+                    "finished_at": datetime.utcnow().isoformat()
+                })
+            except Exception as e:
+                print(f"PDF report {job_id} for quiz {quiz_id} failed: {e}")
+                self.set_status(job_id, {"status": "failed", "error": str(e)})
+            finally:
+                db.session.remove()
+
+    def _build_once(self, quiz_id, key, last_id):
+        with self._lock:
+            future = self._building.get(key)
+            owner = future is None
+            if owner:
+                future = self._building[key] = Future()
+
+        if not owner:
+            return future.result(), True
+
+        try:
+            pdf_bytes = self.binary.get(key)
+            cached = pdf_bytes is not None
+            if not cached:
+                pdf_bytes = self.render(quiz_id, last_id)
+                self.binary.set(key, pdf_bytes, ex=self.cache_ttl)
+            future.set_result(pdf_bytes)
+            return pdf_bytes, cached
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._building.pop(key, None)
+
+    def render(self, quiz_id, last_id: int) -> bytes:
+        """
+        Rezultati se citaju u komadima od chunk_size redova, sa korisnikom
+        ucitanim u istom upitu (JOIN), vec sortirani u bazi. Rezultati noviji
+        od snimka (id > last_id) ne ulaze, pa PDF odgovara kljucu u kesu.
+        """
+        query = (
+            select(Result)
+            .options(joinedload(Result.user))
+            .where(Result.quiz_id == str(quiz_id), Result.id <= last_id)
+            .order_by(Result.score.desc(), Result.time_spent.is_(None), Result.time_spent, Result.id)
+            .execution_options(yield_per=self.chunk_size)
+        )
+
+        buffer = BytesIO()
+        c = canvas.Canvas(buffer)
+        c.setTitle(f"Quiz report {quiz_id}")
+
+        y = 800
+        c.drawString(50, y, f"Quiz report for quiz_id: {quiz_id}")
+        y -= 25
+        c.drawString(50, y, "Player (email) - Score - Time(s)")
+        y -= 20
+
+        for r in db.session.scalars(query):
+            line = f"{r.user.get_full_name()} ({r.user.email}) - {r.score} - {r.time_spent if r.time_spent is not None else '-'}"
+            c.drawString(50, y, line)
+            y -= 16
+            if y < 60:
+                c.showPage()
+                y = 800
+
+        c.save()
+        pdf_bytes = buffer.getvalue()
+        buffer.close()
+        return pdf_bytes
+
+    @staticmethod
+    def _send(quiz_id, to_email: str, pdf_bytes: bytes) -> None:
+        email_dispatcher.enqueue("pdf_report", to_email, {
+            "subject": "Quiz PDF Report",
+            "body_html": f"<p>U prilogu je PDF izvještaj za kviz <b>{quiz_id}</b>.</p>",
+            "filename": f"quiz_{quiz_id}_report.pdf"
+        }, attachment=pdf_bytes)
+
+
+report_service = ReportService()
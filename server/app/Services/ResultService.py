@@ -0,0 +1,246 @@
+from app.Database.db import db
+from app.Domain.models.Result import Result
+from app.Domain.models.User import User
+from app.Domain.models.UserQuizStats import UserQuizStats
+from datetime import datetime
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.Extensions.socketio_ext import socketio
+from app.Services.LeaderboardService import leaderboard_service
+
+
+class ResultService:
+
+    REQUIRED_FIELDS = ("user_email", "quiz_id", "quiz_title", "score", "total_questions", "percentage")
+
+    @classmethod
+    def validate_entry(cls, entry) -> None:
+        """
+        Baca ValueError za rezultat koji se nikad ne bi mogao upisati
+        (nedostaju polja, nisu brojevi, predugi stringovi za kolone).
+        """
+        if not isinstance(entry, dict):
+            raise ValueError("Result entry must be an object")
+
+        missing = [field for field in cls.REQUIRED_FIELDS if entry.get(field) in (None, "")]
+        if missing:
+            raise ValueError(f"Missing fields: {', '.join(missing)}")
+
+        try:
+            int(entry["score"])
+            int(entry["total_questions"])
+            float(entry["percentage"])
+            if entry.get("time_spent") is not None:
+                int(entry["time_spent"])
+        except (TypeError, ValueError):
+            raise ValueError("score, total_questions, percentage and time_spent must be numbers")
+
+        if len(str(entry["quiz_id"])) > 50 or len(str(entry["quiz_title"])) > 100:
+            raise ValueError("quiz_id or quiz_title is too long")
+
+    def save_results(self, entries: list) -> list:
+        """
+        Upisuje vise rezultata u jednoj transakciji.
+        Email adrese se razrjesavaju jednim upitom, a rezultati ciji je
+        submission_id vec upisan se preskacu (isporuka je at-least-once).
+        """
+        emails = {e.get("user_email") for e in entries if e.get("user_email")}
+        users = User.query.filter(User.email.in_(emails)).all() if emails else []
+        user_ids = {u.email: u.id for u in users}
+
+        keys = {e.get("idempotency_key") for e in entries if e.get("idempotency_key")}
+        existing = set()
+        if keys:
+            rows = db.session.query(Result.submission_id).filter(Result.submission_id.in_(keys)).all()
+            existing = {r[0] for r in rows}
+
+        saved = []
+        for entry in entries:
+            user_id = user_ids.get(entry.get("user_email"))
+            if user_id is None:
+                print(f"Result skipped, user not found: {entry.get('user_email')}")
+                continue
+
+            key = entry.get("idempotency_key")
+            if key and key in existing:
+                continue
+            if key:
+                existing.add(key)
+
+            time_spent = entry.get("time_spent")
+            res = Result(
+                user_id=user_id,
+                quiz_id=str(entry["quiz_id"]),
+                quiz_title=str(entry["quiz_title"]),
+                score=int(entry["score"]),
+                total_questions=int(entry["total_questions"]),
+                percentage=float(entry["percentage"]),
+                time_spent=int(time_spent) if time_spent is not None else None,
+                submission_id=key
+            )
+            db.session.add(res)
+            saved.append((res, entry.get("job_id")))
+
+        self._update_stats([res for res, _ in saved])
+
+        try:
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise e
+
+        try:
+            leaderboard_service.record_results([res for res, _ in saved], {u.id: u for u in users})
+        except Exception as e:
+            print(f"Leaderboard update failed: {e}")
+
+        for res, job_id in saved:
+            self._notify_user(res, job_id)
+
+        return [res for res, _ in saved]
+
+    def _update_stats(self, results: list) -> None:
+        """
+        Azurira zbirne redove (igrac, kviz) u istoj transakciji kao i rezultate.
+        Pokusaji se prvo saberu po paru, pa ide jedan upsert (INSERT ... ON
+        DUPLICATE KEY UPDATE): dva consumer-a koja istovremeno upisuju prvi
+        pokusaj istog para ne sudaraju se na unique kljucu.
+        """
+        if not results:
+            return
+
+        now = datetime.utcnow()
+        totals = {}
+        for res in results:
+            row = totals.setdefault((res.user_id, res.quiz_id), {
+                "user_id": res.user_id, "quiz_id": res.quiz_id, "quiz_title": res.quiz_title,
+                "attempts": 0, "percentage_sum": 0.0, "best_score": 0, "best_percentage": 0.0,
+                "last_attempt_at": now
+            })
+            row["quiz_title"] = res.quiz_title
+            row["attempts"] += 1
+            row["percentage_sum"] += res.percentage
+            row["best_score"] = max(row["best_score"], res.score)
+            row["best_percentage"] = max(row["best_percentage"], res.percentage)
+
+        #isti redoslijed zakljucavanja u svim transakcijama
+        rows = [totals[pair] for pair in sorted(totals)]
+        db.session.execute(self._stats_upsert(rows))
+
+    @staticmethod
+    def _stats_upsert(rows: list):
+        stats = UserQuizStats.__table__.c
+        if db.engine.dialect.name == "sqlite":
+            #lokalni razvoj i testovi bez MySQL-a
+            stmt = sqlite_insert(UserQuizStats).values(rows)
+            new, greatest = stmt.excluded, db.func.max
+            return stmt.on_conflict_do_update(
+                index_elements=[stats.user_id, stats.quiz_id],
+                set_=ResultService._stats_merge(stats, new, greatest)
+            )
+
+        stmt = mysql_insert(UserQuizStats).values(rows)
+        return stmt.on_duplicate_key_update(**ResultService._stats_merge(stats, stmt.inserted, db.func.greatest))
+
+    @staticmethod
+    def _stats_merge(stats, new, greatest) -> dict:
+        return {
+            "quiz_title": new.quiz_title,
+            "attempts": stats.attempts + new.attempts,
+            "percentage_sum": stats.percentage_sum + new.percentage_sum,
+            "best_score": greatest(stats.best_score, new.best_score),
+            "best_percentage": greatest(stats.best_percentage, new.best_percentage),
+            "last_attempt_at": greatest(stats.last_attempt_at, new.last_attempt_at)
+        }
+
+    def rebuild_stats(self) -> int:
+        """
+        Puni user_quiz_stats iz postojecih rezultata jednim GROUP BY upitom
+        (za rezultate upisane prije uvodjenja tabele). Vraca broj redova.
+        """
+        rows = (
+            db.session.query(
+                Result.user_id, Result.quiz_id, db.func.max(Result.quiz_title),
+                db.func.count(Result.id), db.func.sum(Result.percentage),
+                db.func.max(Result.score), db.func.max(Result.percentage), db.func.max(Result.created_at)
+            )
+            .group_by(Result.user_id, Result.quiz_id)
+            .all()
+        )
+
+        UserQuizStats.query.delete()
+        db.session.add_all([
+            UserQuizStats(user_id=user_id, quiz_id=quiz_id, quiz_title=title, attempts=attempts,
+                          percentage_sum=percentage_sum or 0.0, best_score=best_score,
+                          best_percentage=best_percentage, last_attempt_at=last_attempt)
+            for user_id, quiz_id, title, attempts, percentage_sum, best_score, best_percentage, last_attempt in rows
+        ])
+        db.session.commit()
+        return len(rows)
+
+    EXPORT_COLUMNS = ("result_id", "quiz_id", "quiz_title", "user_id", "first_name", "last_name", "email",
+                      "score", "total_questions", "percentage", "time_spent", "created_at")
+
+    def iter_export_rows(self, quiz_id=None, batch_size: int = 1000):
+        """
+        Generator redova za izvoz (tuple po EXPORT_COLUMNS), sa imenima
+        korisnika spojenim u SQL-u. stream_results trazi server-side kursor,
+        a yield_per cita po batch_size redova, pa memorija ne raste sa brojem
+        rezultata. Konekcija ostaje zauzeta dok se generator ne potrosi ili zatvori.
+        """
+        query = (
+            db.select(Result.id, Result.quiz_id, Result.quiz_title, Result.user_id,
+                      User.first_name, User.last_name, User.email,
+                      Result.score, Result.total_questions, Result.percentage,
+                      Result.time_spent, Result.created_at)
+            .join(User, User.id == Result.user_id)
+            .order_by(Result.id)
+            .execution_options(stream_results=True, yield_per=batch_size)
+        )
+        if quiz_id is not None:
+            query = query.where(Result.quiz_id == str(quiz_id))
+
+        rows = db.session.execute(query)
+        try:
+            for row in rows:
+                yield tuple(row)
+        finally:
+            rows.close()
+
+    def stats_for_user(self, user_id: int) -> dict:
+        rows = (
+            UserQuizStats.query
+            .filter_by(user_id=user_id)
+            .order_by(UserQuizStats.last_attempt_at.desc())
+            .all()
+        )
+        attempts = sum(row.attempts for row in rows)
+        percentage_sum = sum(row.percentage_sum for row in rows)
+
+        return {
+            "attempt_count": attempts,
+            "average_percentage": round(percentage_sum / attempts, 2) if attempts else 0.0,
+            "quizzes": [
+                {
+                    "quiz_id": row.quiz_id,
+                    "quiz_title": row.quiz_title,
+                    "attempts": row.attempts,
+                    "best_score": row.best_score,
+                    "best_percentage": row.best_percentage,
+                    "average_percentage": round(row.average_percentage, 2),
+                    "last_attempt": row.last_attempt_at.strftime("%Y-%m-%d %H:%M:%S")
+                }
+                for row in rows
+            ]
+        }
+
+    def _notify_user(self, res: Result, job_id):
+        #javljamo igracu da je kviz ocijenjen, front vise ne mora da polluje /history
+        socketio.emit('quiz_graded', {
+            'job_id': job_id,
+            'quiz_id': res.quiz_id,
+            'quiz_title': res.quiz_title,
+            'score': res.score,
+            'total_questions': res.total_questions,
+            'percentage': res.percentage
+        }, to=f"user_{res.user_id}")
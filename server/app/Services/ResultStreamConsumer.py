@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import socket
+import threading
+from app.Database.db import db
+from app.Extensions.redis_ext import redis_client
+from app.Services.ResultService import ResultService
+
+
+class ResultStreamConsumer:
+    """
+    Cita rezultate iz Redis streama "quiz_results" kao clan consumer grupe i
+    upisuje ih u MySQL u serijama. Poruka se potvrdjuje (XACK) tek nakon
+    commit-a, pa se nakon pada ponovo obradjuje (at-least-once).
+
+    Neispravne poruke i poruke koje ni posle RESULT_STREAM_MAX_DELIVERIES
+    isporuka ne mogu da se upisu idu u stream "quiz_results:dead" i
+    potvrdjuju se, da jedna losa poruka ne bi zaustavila sve iza nje.
+    """
+
+    STREAM = "quiz_results"
+    DEAD_STREAM = "quiz_results:dead"
+    GROUP = "main_server"
+
+    def __init__(self):
+        self.batch_size = int(os.getenv("RESULT_STREAM_BATCH", 100))
+        self.block_ms = int(os.getenv("RESULT_STREAM_BLOCK_MS", 5000))
+        self.claim_idle_ms = int(os.getenv("RESULT_STREAM_CLAIM_IDLE_MS", 60000))
+        self.max_deliveries = int(os.getenv("RESULT_STREAM_MAX_DELIVERIES", 5))
+        self.name = f"{socket.gethostname()}-{os.getpid()}"
+        self.result_service = ResultService()
+        self._thread = None
+
+    def start(self, app):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, args=(app,), name="result-stream-consumer", daemon=True)
+        self._thread.start()
+
+    def _ensure_group(self):
+        try:
+            redis_client.xgroup_create(self.STREAM, self.GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def _run(self, app):
+        #prvo prolazimo kroz svoje nepotvrdjene poruke ("0"), pa tek onda citamo nove (">")
+        last_id = "0"
+        group_ready = False
+
+        while True:
+            try:
+                if not group_ready:
+                    self._ensure_group()
+                    group_ready = True
+
+                response = redis_client.xreadgroup(
+                    self.GROUP, self.name, {self.STREAM: last_id},
+                    count=self.batch_size, block=self.block_ms
+                )
+                messages = response[0][1] if response else []
+
+                if not messages:
+                    if last_id == "0":
+                        last_id = ">"
+                        continue
+                    #preuzimamo poruke koje su zaglavile kod ugasenih consumer-a
+                    claimed = redis_client.xautoclaim(
+                        self.STREAM, self.GROUP, self.name,
+                        min_idle_time=self.claim_idle_ms, start_id="0-0", count=self.batch_size
+                    )
+                    messages = claimed[1] if claimed else []
+                    if not messages:
+                        continue
+
+                #istoriju nepotvrdjenih citamo redom, neuspjele poruke ostaju
+                #na cekanju i vracaju se preko XAUTOCLAIM-a kad odleze
+                if last_id != ">":
+                    last_id = messages[-1][0]
+
+                with app.app_context():
+                    self._handle(messages)
+
+            except Exception as e:
+                print(f"Result stream consumer error: {e}")
+                group_ready = False
+                last_id = "0"
+                time.sleep(1)
+
+    def _handle(self, messages):
+        done = []
+        valid = []
+        for message_id, fields in messages:
+            if not fields:
+                #poruka je u medjuvremenu obrisana iz streama (MAXLEN)
+                done.append(message_id)
+                continue
+            try:
+                entry = json.loads(fields["payload"])
+                self.result_service.validate_entry(entry)
+                valid.append((message_id, entry))
+            except (KeyError, ValueError) as e:
+                self._dead_letter(message_id, fields, f"Invalid result: {e}")
+
+        if valid:
+            try:
+                self.result_service.save_results([entry for _, entry in valid])
+                done.extend(message_id for message_id, _ in valid)
+            except Exception as e:
+                db.session.rollback()
+                print(f"Saving {len(valid)} result(s) failed, retrying one by one: {e}")
+                done.extend(self._save_each(valid))
+
+        if done:
+            redis_client.xack(self.STREAM, self.GROUP, *done)
+
+    def _save_each(self, valid):
+        done = []
+        for message_id, entry in valid:
+            try:
+                self.result_service.save_results([entry])
+                done.append(message_id)
+            except Exception as e:
+                db.session.rollback()
+                if self._deliveries(message_id) >= self.max_deliveries:
+                    self._dead_letter(message_id, {"payload": json.dumps(entry)}, str(e))
+                else:
+                    print(f"Result message {message_id} failed, will be retried: {e}")
+        return done
+
+    def _deliveries(self, message_id) -> int:
+        pending = redis_client.xpending_range(self.STREAM, self.GROUP, min=message_id, max=message_id, count=1)
+        return pending[0]["times_delivered"] if pending else 0
+
+    def _dead_letter(self, message_id, fields, error):
+        print(f"Result message {message_id} moved to {self.DEAD_STREAM}: {error}")
+        pipe = redis_client.pipeline()
+        pipe.xadd(self.DEAD_STREAM, {
+            "message_id": message_id,
+            "payload": fields.get("payload", ""),
+            "error": str(error)[:500]
+        }, maxlen=10000, approximate=True)
+        pipe.xack(self.STREAM, self.GROUP, message_id)
+        pipe.execute()
+
+
+result_stream_consumer = ResultStreamConsumer()
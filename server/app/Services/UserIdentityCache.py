@@ -0,0 +1,68 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from app.Database.UserRepository import UserRepository
+
+
+@dataclass(frozen=True)
+class UserIdentity:
+    id: int
+    email: str
+    role: str
+    first_name: str
+    last_name: str
+
+    def get_full_name(self) -> str:
+        return f"{self.first_name} {self.last_name}"
+
+
+class UserIdentityCache:
+    """
+    Kes podataka o korisniku potrebnih za autorizaciju (uloga, email) po
+    procesu, ogranicen TTL-om i brojem unosa. UserService ga invalidira pri
+    promjeni uloge, profila i brisanju korisnika; TTL ogranicava koliko dugo
+    drugi procesi mogu vidjeti stare podatke.
+    """
+
+    def __init__(self, ttl: float | None = None, maxsize: int | None = None):
+        self.ttl = ttl or float(os.getenv("USER_CACHE_TTL", 60))
+        self.maxsize = maxsize or int(os.getenv("USER_CACHE_SIZE", 10000))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.repo = UserRepository()
+
+    def get(self, user_id) -> UserIdentity | None:
+        user_id = int(user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                return entry[1]
+
+        user = self.repo.get_by_id(user_id)
+        if user is None:
+            self.invalidate(user_id)
+            return None
+
+        identity = UserIdentity(
+            id=user.id,
+            email=user.email,
+            role=user.role.value,
+            first_name=user.first_name,
+            last_name=user.last_name
+        )
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, identity)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return identity
+
+    def invalidate(self, user_id) -> None:
+        with self._lock:
+            self._entries.pop(int(user_id), None)
+
+
+user_identity_cache = UserIdentityCache()
@@ -5,11 +5,13 @@ from datetime import datetime
 from app.Database.UserRepository import UserRepository
 from app.Domain.enums.role import Role
 from app.Domain.models.User import User
-from app.Extensions.bcrypt import bcrypt
+from app.Extensions.password_hasher import password_hasher
 from app.Domain.DTOs.UserDTO import UserDTO
 from app.Domain.DTOs.UserSummaryDTO import UserSummaryDTO
 from app.Domain.DTOs.UserListDTO import UserListDTO
 from app.Domain.DTOs.UserCreatedDTO import UserCreatedDTO
+from app.Services.UserIdentityCache import user_identity_cache
+from app.Services.LeaderboardService import leaderboard_service
 
 class UserService:
     def __init__(self):
@@ -25,7 +27,7 @@ class UserService:
         if self.repo.get_by_email(email):
             return None, 409
 
-        hashed_password = bcrypt.generate_password_hash(password).decode("utf-8")
+        hashed_password = password_hasher.hash(password)
 
         user = User(
             email=email,
@@ -53,6 +55,8 @@ class UserService:
         deleted_dto = UserCreatedDTO.from_model(user)
 
         self.repo.delete(user_id)
+        user_identity_cache.invalidate(user_id)
+        self._sync_leaderboard(leaderboard_service.remove_user, user_id)
         return deleted_dto, 200
 
     def update_user_profile(self, user_id: int, data):
@@ -67,9 +71,11 @@ class UserService:
                 setattr(user, f, data[f])
 
         if "password" in data and data["password"]:
-            user.password_hash = bcrypt.generate_password_hash(data["password"]).decode("utf-8")
+            user.password_hash = password_hasher.hash(data["password"])
 
         self.repo.update(user)
+        user_identity_cache.invalidate(user_id)
+        self._sync_leaderboard(leaderboard_service.update_display_name, user)
         return UserDTO.from_model(user), 200
 
     def change_user_role(self, user_id: int, new_role: Role):
@@ -80,9 +86,17 @@ class UserService:
 
         user.role = new_role
         self.repo.update(user)
+        user_identity_cache.invalidate(user_id)
 
         return UserDTO.from_model(user), 200
 
+    @staticmethod
+    def _sync_leaderboard(action, arg):
+        try:
+            action(arg)
+        except Exception as e:
+            print(f"Leaderboard name update failed: {e}")
+
     def get_user_by_id(self, user_id: int):
         user = self.repo.get_by_id(user_id)
 
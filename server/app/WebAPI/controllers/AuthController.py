@@ -3,7 +3,7 @@ from app.Services.AuthService import AuthService, AuthResult
 
 from app.Domain.models.User import User
 from app.Domain.enums.role import Role
-from app.Extensions.bcrypt import bcrypt
+from app.Extensions.password_hasher import PasswordHasherBusy
 
 auth_bp = Blueprint("auth", __name__)
 authService = AuthService()
@@ -24,7 +24,10 @@ def login():
     
     user = User.query.filter_by(email=email).first()
     
-    result, token = authService.login(user, password)
+    try:
+        result, token = authService.login(user, password, email=email, client_ip=request.remote_addr)
+    except PasswordHasherBusy as e:
+        return jsonify({"message": str(e)}), 503, {"Retry-After": str(e.retry_after)}
 
     if result == AuthResult.BLOCKED:
         return jsonify({"message": "Account is temporarily blocked"}), 403
@@ -1,29 +1,51 @@
 import os
-from io import BytesIO
-from reportlab.pdfgen import canvas
-from flask import Blueprint, request, jsonify
+import csv
+from datetime import datetime
+from sqlalchemy import and_, or_
+from flask import Blueprint, Response, request, jsonify, stream_with_context, url_for
 from app.Extensions.socketio_ext import socketio
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, decode_token
+from flask_socketio import join_room
 from app.Domain.models.User import User
-from functools import wraps
-import requests
 from app.Database.db import db
 from app.Domain.models.Result import Result
 from app.Domain.enums.role import Role
-from app.Extensions.email_sender import EmailSender
+from app.Middleware.role_required import role_required, current_identity
+from app.Services.ResultService import ResultService
+from app.Services.LeaderboardService import leaderboard_service
+from app.Services.ReportService import report_service
+from app.Extensions.quiz_service_client import quiz_service_client, UpstreamUnavailable
+from app.Extensions.micro_cache import MicroCache
 
 quiz_proxy_bp = Blueprint("quiz_proxy", __name__)
-QUIZ_SERVICE_URL = "http://localhost:5001/api/quizzes"
-
-def admin_required(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        if not user or user.role != 'ADMIN':
-            return jsonify({"msg": "Only Admin can perform this action"}), 403
-        return f(*args, **kwargs)
-    return decorated_function
+result_service = ResultService()
+NDJSON_MIMETYPE = "application/x-ndjson"
+EXPORT_CHUNK_SIZE = 64 * 1024
+CSV_EXPORT_BATCH = int(os.getenv("CSV_EXPORT_BATCH", 1000))
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", 50))
+HISTORY_MAX_PAGE_SIZE = int(os.getenv("HISTORY_MAX_PAGE_SIZE", 200))
+LEADERBOARD_DEFAULT_SIZE = int(os.getenv("LEADERBOARD_DEFAULT_SIZE", 100))
+LEADERBOARD_MAX_SIZE = int(os.getenv("LEADERBOARD_MAX_SIZE", 1000))
+
+#kviz bez tacnih odgovora je isti za sve igrace, kratko ga drzimo u gateway-u
+quiz_details_cache = MicroCache(
+    ttl=float(os.getenv("QUIZ_DETAILS_CACHE_TTL", 2)),
+    maxsize=int(os.getenv("QUIZ_DETAILS_CACHE_SIZE", 1024))
+)
+
+#uslovni GET: If-None-Match klijenta ide do quiz_service-a nepromijenjen
+def conditional_headers():
+    if_none_match = request.headers.get("If-None-Match")
+    return {"If-None-Match": if_none_match} if if_none_match else {}
+
+#quiz_service je nedostupan (otvoren prekidac ili pun bulkhead), klijent pokusava kasnije
+def upstream_unavailable(e):
+    response = jsonify({"error": str(e)})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response
+
+admin_required = role_required(Role.ADMIN)
 
 @quiz_proxy_bp.route("/notify-admin", methods=["POST"])
 def notify_admin():
@@ -39,6 +61,19 @@ def notify_admin():
 
     return jsonify({"status": "Admin notified via WrbSocket"}), 200
 
+#klijent salje JWT pri konekciji i ulazi u svoju sobu za licna obavjestenja
+@socketio.on("connect")
+def handle_socket_connect(auth=None):
+    token = (auth or {}).get("token")
+    if not token:
+        return
+
+    try:
+        user_id = decode_token(token)["sub"]
+        join_room(f"user_{user_id}")
+    except Exception as e:
+        print(f"Socket auth failed: {e}")
+
 #odobravanje i odbijanje
 @quiz_proxy_bp.route("/<quiz_id>/review", methods=["PATCH"], endpoint="review_quiz_patch")
 @jwt_required()
@@ -48,13 +83,16 @@ def review_quiz(quiz_id):
     new_status = data.get("status")
 
     try:
-        response = requests.patch(f"{QUIZ_SERVICE_URL}/{quiz_id}/status", json=data)
+        response = quiz_service_client.patch(f"/{quiz_id}/status", route="PATCH /<quiz_id>/status", json=data)
+        quiz_details_cache.invalidate(quiz_id)
         if response.status_code == 200 and new_status == "APPROVED":
             socketio.emit('quiz_published', {
                 'message': 'New quiz aveilable',
                 'quiz_id': quiz_id
             })
         return (response.text, response.status_code, response.headers.items())
+    except UpstreamUnavailable as e:
+        return upstream_unavailable(e)
     except Exception as e:
         return jsonify({"error": f"Could not reach Quiz Service: {str(e)}"}), 500
     
@@ -62,52 +100,190 @@ def review_quiz(quiz_id):
 #dobijanje svih kvizova (samo admin)
 @quiz_proxy_bp.route("/", methods=["GET"], endpoint="get_quizzes")
 @jwt_required()
+@role_required(Role.ADMIN, Role.MODERATOR)
 def get_all_quizzes_proxy():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user or user.role not in ['ADMIN', 'MODERATOR']:
-        return jsonify({"msg": "Unauthorized"}), 403
-    
+    #NDJSON izvoz se prosljedjuje u dijelovima, bez baferovanja cijelog odgovora
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        return stream_quizzes_export()
+
     try:
-        response = requests.get(f"{QUIZ_SERVICE_URL}")
+        response = quiz_service_client.get("/", params=request.args, headers=conditional_headers())
         return (response.text, response.status_code, response.headers.items())
+    except UpstreamUnavailable as e:
+        return upstream_unavailable(e)
+    except Exception as e:
+        return jsonify({"error": f"Could not reach Quiz Service: {str(e)}"}), 500
+
+def stream_quizzes_export():
+    try:
+        upstream = quiz_service_client.get(
+            "/",
+            route="GET / (ndjson)",
+            params=request.args,
+            headers={"Accept": NDJSON_MIMETYPE},
+            stream=True
+        )
+    except UpstreamUnavailable as e:
+        return upstream_unavailable(e)
     except Exception as e:
         return jsonify({"error": f"Could not reach Quiz Service: {str(e)}"}), 500
+
+    if upstream.status_code != 200:
+        body = upstream.content
+        upstream.close()
+        return (body, upstream.status_code, {"Content-Type": upstream.headers.get("Content-Type", "application/json")})
+
+    def generate():
+        try:
+            for chunk in upstream.iter_content(chunk_size=EXPORT_CHUNK_SIZE):
+                if chunk:
+                    yield chunk
+        finally:
+            upstream.close()
+
+    return Response(stream_with_context(generate()), status=200, mimetype=NDJSON_MIMETYPE)
     
 
+#izvoz rezultata u CSV, red po red iz MySQL-a
+@quiz_proxy_bp.route("/results.csv", methods=["GET"])
+@jwt_required()
+@admin_required
+def export_all_results_csv():
+    return stream_results_csv(None, "results.csv")
+
+@quiz_proxy_bp.route("/<quiz_id>/results.csv", methods=["GET"])
+@jwt_required()
+@admin_required
+def export_quiz_results_csv(quiz_id):
+    return stream_results_csv(quiz_id, f"quiz_{quiz_id}_results.csv")
+
+class CsvBuffer:
+    #csv.writer pise ovdje, a generator prazni bafer kad se napuni
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+
+    def drain(self) -> str:
+        data = "".join(self.parts)
+        self.parts, self.size = [], 0
+        return data
+
+def csv_safe(value):
+    #tekst koji pocinje formulom Excel ne smije izvrsiti
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + value
+    return value
+
+def stream_results_csv(quiz_id, filename):
+    rows = result_service.iter_export_rows(quiz_id, batch_size=CSV_EXPORT_BATCH)
+
+    def generate():
+        buffer = CsvBuffer()
+        writer = csv.writer(buffer)
+        writer.writerow(result_service.EXPORT_COLUMNS)
+        try:
+            for row in rows:
+                writer.writerow([csv_safe(value) for value in row])
+                if buffer.size >= EXPORT_CHUNK_SIZE:
+                    yield buffer.drain()
+            yield buffer.drain()
+        finally:
+            rows.close()
+
+    return Response(
+        stream_with_context(generate()),
+        status=200,
+        mimetype="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @quiz_proxy_bp.route("/<quiz_id>/submit", methods=["POST"])
 @jwt_required()
 def submit_and_save_result(quiz_id):
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = current_identity()
+    if not user:
+        return jsonify({"message": "User not found"}), 404
 
     user_answers = request.json #odgovori koje salje front
     user_answers['user_email'] = user.email
+    user_answers['user_id'] = user.id
 
     try:
-        quiz_service_res = requests.post(
-            f"http://localhost:5001/api/quizzes/{quiz_id}/submit", 
+        quiz_service_res = quiz_service_client.post(
+            f"/{quiz_id}/submit",
+            route="POST /<quiz_id>/submit",
             json=user_answers
         )
 
         if quiz_service_res.status_code == 202:
             return jsonify({
-                "message": "Quiz successfully sent for processing. You can continue working."
+                "message": "Quiz successfully sent for processing. You can continue working.",
+                "job_id": quiz_service_res.json().get("job_id"),
+                "status": "queued"
             }), 202
         
         return quiz_service_res.text, quiz_service_res.status_code
     
+    except UpstreamUnavailable as e:
+        return upstream_unavailable(e)
     except Exception as e:
         return jsonify({"error": f"Failed to communicate with Quiz Service: {str(e)}"}), 500
         
 
+#status ocjenjivanja, igrac vidi samo svoje predaje
+@quiz_proxy_bp.route("/submissions/<job_id>", methods=["GET"])
+@jwt_required()
+def get_submission_status(job_id):
+    current_user_id = get_jwt_identity()
+
+    try:
+        response = quiz_service_client.get(f"/submissions/{job_id}", route="GET /submissions/<job_id>")
+    except UpstreamUnavailable as e:
+        return upstream_unavailable(e)
+    except Exception as e:
+        return jsonify({"error": f"Could not reach Quiz Service: {str(e)}"}), 500
+
+    if response.status_code != 200:
+        return (response.text, response.status_code, response.headers.items())
+
+    record = response.json()
+    if str(record.get("user_id")) != str(current_user_id):
+        return jsonify({"message": "Submission not found"}), 404
+
+    return jsonify(record), 200
+
 @quiz_proxy_bp.route("/history", methods=["GET"])
 @jwt_required()
 def get_user_history():
     current_user_id = get_jwt_identity()
 
-    results = Result.query.filter_by(user_id=current_user_id).order_by(Result.created_at.desc()).all()
+    #keyset paginacija po (created_at, id), sljedeca strana u X-Next-Cursor
+    try:
+        limit = int(request.args.get("limit", HISTORY_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "limit must be a number"}), 400
+    if limit < 1 or limit > HISTORY_MAX_PAGE_SIZE:
+        return jsonify({"error": f"limit must be between 1 and {HISTORY_MAX_PAGE_SIZE}"}), 400
+
+    query = Result.query.filter(Result.user_id == current_user_id)
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            created_at, last_id = cursor.rsplit("_", 1)
+            created_at, last_id = datetime.fromisoformat(created_at), int(last_id)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+        query = query.filter(or_(
+            Result.created_at < created_at,
+            and_(Result.created_at == created_at, Result.id < last_id)
+        ))
+
+    results = query.order_by(Result.created_at.desc(), Result.id.desc()).limit(limit).all()
 
     history_data = []
     for res in results:
@@ -122,7 +298,17 @@ def get_user_history():
             "date": res.created_at.strftime("%Y-%m-%d %H:%M:%S")
         })
 
-    return jsonify(history_data), 200
+    response = jsonify(history_data)
+    if len(results) == limit:
+        last = results[-1]
+        response.headers["X-Next-Cursor"] = f"{last.created_at.isoformat()}_{last.id}"
+    return response, 200
+
+#zbirna statistika igraca iz user_quiz_stats, bez skeniranja istorije
+@quiz_proxy_bp.route("/history/stats", methods=["GET"])
+@jwt_required()
+def get_user_history_stats():
+    return jsonify(result_service.stats_for_user(int(get_jwt_identity()))), 200
 
 @quiz_proxy_bp.route("/internal/results", methods=["POST"])
 def internal_save_result():
@@ -132,141 +318,143 @@ def internal_save_result():
 
     data = request.get_json() or {}
 
-    user_email = data.get("user_email")
-    quiz_id = data.get("quiz_id")
-    quiz_title = data.get("quiz_title")
-    score = data.get("score")
-    total_questions = data.get("total_questions")
-    percentage = data.get("percentage")
-    time_spent = data.get("time_spent")
-
-    if not all([user_email, quiz_id, quiz_title]) or score is None or total_questions is None or percentage is None:
-        return jsonify({"message": "Missing fields"}), 400
+    try:
+        result_service.validate_entry(data)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
 
-    user = User.query.filter_by(email=user_email).first()
+    user = User.query.filter_by(email=data["user_email"]).first()
     if not user:
         return jsonify({"message": "User not found"}), 404
 
-    res = Result(
-        user_id=user.id,
-        quiz_id=str(quiz_id),
-        quiz_title=str(quiz_title),
-        score=int(score),
-        total_questions=int(total_questions),
-        percentage=float(percentage),
-        time_spent=int(time_spent) if time_spent is not None else None
-    )
-
-    db.session.add(res)
-    db.session.commit()
+    result_service.save_results([data])
 
     return jsonify({"status": "saved"}), 200
 
+#histogram trajanja poziva prema quiz_service-u po ruti
+@quiz_proxy_bp.route("/internal/upstream-metrics", methods=["GET"])
+def upstream_metrics():
+    token = request.headers.get("X-Internal-Token")
+    if token != os.getenv("INTERNAL_API_KEY"):
+        return jsonify({"message": "Unauthorized"}), 403
+
+    return jsonify(quiz_service_client.latency.snapshot()), 200
+
 
 
 @quiz_proxy_bp.route("/<quiz_id>/leaderboard", methods=["GET"])
 @jwt_required()
 def get_leaderboard(quiz_id):
-    results = (
-        Result.query
-        .filter_by(quiz_id=str(quiz_id))
-        .join(User, User.id == Result.user_id)
-        .all()
-    )
+    #najbolji pokusaj po igracu, top-K iz Redis ZSET-a
+    try:
+        limit = int(request.args.get("limit", LEADERBOARD_DEFAULT_SIZE))
+    except ValueError:
+        return jsonify({"error": "limit must be a number"}), 400
+    if limit < 1 or limit > LEADERBOARD_MAX_SIZE:
+        return jsonify({"error": f"limit must be between 1 and {LEADERBOARD_MAX_SIZE}"}), 400
 
-    results_sorted = sorted(
-        results,
-        key=lambda r: (-r.score, r.time_spent if r.time_spent is not None else 10**9)
-    )
+    try:
+        return jsonify(leaderboard_service.top(quiz_id, limit)), 200
+    except Exception as e:
+        return jsonify({"error": f"Leaderboard unavailable: {str(e)}"}), 503
+
+@quiz_proxy_bp.route("/<quiz_id>/leaderboard/me", methods=["GET"])
+@jwt_required()
+def get_my_rank(quiz_id):
+    try:
+        entry = leaderboard_service.rank(quiz_id, get_jwt_identity())
+    except Exception as e:
+        return jsonify({"error": f"Leaderboard unavailable: {str(e)}"}), 503
 
-    return jsonify([
-        {
-            "user_id": r.user_id,
-            "full_name": r.user.get_full_name(),
-            "email": r.user.email,
-            "score": r.score,
-            "time_spent": r.time_spent
-        }
-        for r in results_sorted
-    ]), 200
+    if entry is None:
+        return jsonify({"message": "No result for this quiz"}), 404
+    return jsonify(entry), 200
 
 
 @quiz_proxy_bp.route("/<quiz_id>/report", methods=["GET"])
 @jwt_required()
 @admin_required
 def send_quiz_report(quiz_id):
-    admin_id = get_jwt_identity()
-    admin = User.query.get(admin_id)
-
-    results = (
-        Result.query
-        .filter_by(quiz_id=str(quiz_id))
-        .join(User, User.id == Result.user_id)
-        .all()
-    )
+    admin = current_identity()
 
-    results_sorted = sorted(
-        results,
-        key=lambda r: (-r.score, r.time_spent if r.time_spent is not None else 10**9)
-    )
+    try:
+        job = report_service.submit(quiz_id, admin.email, admin.id)
+    except Exception as e:
+        return jsonify({"error": f"Could not start report: {str(e)}"}), 500
 
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer)
-    c.setTitle(f"Quiz report {quiz_id}")
-
-    y = 800
-    c.drawString(50, y, f"Quiz report for quiz_id: {quiz_id}")
-    y -= 25
-    c.drawString(50, y, "Player (email) - Score - Time(s)")
-    y -= 20
-
-    for r in results_sorted:
-        line = f"{r.user.get_full_name()} ({r.user.email}) - {r.score} - {r.time_spent if r.time_spent is not None else '-'}"
-        c.drawString(50, y, line)
-        y -= 16
-        if y < 60:
-            c.showPage()
-            y = 800
-
-    c.save()
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-
-    EmailSender().send_pdf_report(
-        to_email=admin.email,
-        subject="Quiz PDF Report",
-        body_html=f"<p>U prilogu je PDF izvještaj za kviz <b>{quiz_id}</b>.</p>",
-        pdf_bytes=pdf_bytes,
-        filename=f"quiz_{quiz_id}_report.pdf"
-    )
+    #PDF iz kesa je vec u outbox-u, inace klijent prati posao preko /reports/<job_id>
+    if job["status"] == "done":
+        return jsonify(job), 200
+    response = jsonify(job)
+    response.status_code = 202
+    response.headers["Location"] = url_for("quiz_proxy.get_report_status", job_id=job["job_id"])
+    return response
 
-    return jsonify({"status": "sent"}), 200
+@quiz_proxy_bp.route("/reports/<job_id>", methods=["GET"])
+@jwt_required()
+@admin_required
+def get_report_status(job_id):
+    try:
+        record = report_service.get_status(job_id)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    if not record:
+        return jsonify({"message": "Report job not found"}), 404
+    return jsonify(record), 200
+
+#analiza pitanja kviza se racuna u quiz_service-u iz inkrementalnih agregata
+@quiz_proxy_bp.route("/<quiz_id>/analytics", methods=["GET"])
+@jwt_required()
+@role_required(Role.ADMIN, Role.MODERATOR)
+def get_item_analytics(quiz_id):
+    try:
+        response = quiz_service_client.get(f"/{quiz_id}/analytics", route="GET /<quiz_id>/analytics")
+        return (response.content, response.status_code, {"Content-Type": response.headers.get("Content-Type", "application/json")})
+    except UpstreamUnavailable as e:
+        return upstream_unavailable(e)
+    except Exception as e:
+        return jsonify({"error": f"Could not reach Quiz Service: {str(e)}"}), 500
+
+def fetch_quiz_details(quiz_id):
+    response = quiz_service_client.get(f"/{quiz_id}", route="GET /<quiz_id>")
+    headers = {"Content-Type": response.headers.get("Content-Type", "application/json")}
+    if response.headers.get("ETag"):
+        headers["ETag"] = response.headers["ETag"]
+    return (response.content, response.status_code, headers), response.status_code == 200
 
 @quiz_proxy_bp.route("/<quiz_id>", methods=["GET"])
 @jwt_required()
 def get_quiz_details_proxy(quiz_id):
     try:
-        response = requests.get(f"{QUIZ_SERVICE_URL}/{quiz_id}")
-        return (response.text, response.status_code, response.headers.items())
+        body, status, headers = quiz_details_cache.get_or_load(quiz_id, lambda: fetch_quiz_details(quiz_id))
+        etag = headers.get("ETag")
+        if status == 200 and etag and request.if_none_match.contains_raw(etag):
+            return ("", 304, {"ETag": etag})
+        return (body, status, headers)
+    except UpstreamUnavailable as e:
+        return upstream_unavailable(e)
     except Exception as e:
         return jsonify({"error": f"Could not reach Quiz Service: {str(e)}"}), 500
 
 @quiz_proxy_bp.route("/<quiz_id>", methods=["DELETE"])
 @jwt_required()
 def delete_quiz(quiz_id):
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = current_identity()
 
     if not user:
         return jsonify({"message": "User not found"}), 404
 
     payload = {
-        "requester_role": user.role.value,
+        "requester_role": user.role,
         "requester_id": str(user.id),
     }
 
     try:
-        response = requests.delete(f"{QUIZ_SERVICE_URL}/{quiz_id}", json=payload)
+        response = quiz_service_client.delete(f"/{quiz_id}", route="DELETE /<quiz_id>", json=payload)
+        quiz_details_cache.invalidate(quiz_id)
         return (response.text, response.status_code, response.headers.items())
+    except UpstreamUnavailable as e:
+        return upstream_unavailable(e)
     except Exception as e:
         return jsonify({"error": f"Could not reach Quiz Service: {str(e)}"}), 500
\ No newline at end of file
@@ -6,11 +6,11 @@ from app.Services.UserService import UserService
 from app.WebAPI.validation.UserValidation import UserValidation
 from app.Domain.enums.role import Role
 from app.Middleware.role_required import role_required
-from app.Extensions.email_sender import EmailSender
+from app.Services.EmailDispatcher import email_dispatcher
+from app.Extensions.password_hasher import PasswordHasherBusy
 
 user_bp = Blueprint("users", __name__)
 user_service = UserService()
-email_sender = EmailSender()
 
 # CREATE
 @user_bp.route("/register", methods=["POST"])
@@ -21,7 +21,10 @@ def create_user():
     if error:
         return error
 
-    dto, status = user_service.create_user(data)
+    try:
+        dto, status = user_service.create_user(data)
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": str(e.retry_after)}
     if not dto or status != 201:
         return jsonify({"error": "User already exists or invalid data"}), 400
 
@@ -81,6 +84,8 @@ def update_profile():
         if dto is None:
             return jsonify({"error": "Update failed"}), status
         return jsonify(asdict(dto)), 200
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": str(e.retry_after)}
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -113,7 +118,10 @@ def update_user_profile(user_id):
     if error:
         return error
 
-    dto, status = user_service.update_user_profile(user_id, data)
+    try:
+        dto, status = user_service.update_user_profile(user_id, data)
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": str(e.retry_after)}
 
     if not dto:
         return jsonify({"error": f"User with id {user_id} not found"}), status
@@ -139,19 +147,18 @@ def change_user_role(user_id):
     if not dto:
         return jsonify({"error": f"User with id {user_id} not found"}), status
 
-    #slanje mejla
+    #mejl ide u outbox, salje ga pozadinski dispatcher
     try:
         user_email = dto.email
         full_name = f"{dto.first_name} {dto.last_name}"
         
-        email_sender.send_role_change_email(
-            to_email=user_email,
-            new_role=new_role_val,
-            full_name=full_name
-        )
-        print(f"Notification email sent to {user_email} for new role: {new_role_val}")
+        email_dispatcher.enqueue("role_change", user_email, {
+            "new_role": new_role_val,
+            "full_name": full_name
+        })
+        print(f"Notification email queued for {user_email} for new role: {new_role_val}")
     except Exception as e:
-        print(f"Failed to send role change email: {str(e)}")
+        print(f"Failed to queue role change email: {str(e)}")
 
     return jsonify(asdict(dto)), status
 
@@ -1,39 +1,107 @@
+import click
 from flask import Flask
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
 from app.Database.db import db
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
-from app.Extensions.bcrypt import bcrypt
+from app.Extensions.json_provider import FastJSONProvider
 from app.config import Config
 from app.Extensions.socketio_ext import socketio
 from app.WebAPI.controllers.AuthController import auth_bp
 from app.WebAPI.controllers.UserController import user_bp
 from app.WebAPI.controllers.DbTestController import db_test_bp
 from app.WebAPI.controllers.QuizProxyController import quiz_proxy_bp
+from app.Services.ResultStreamConsumer import result_stream_consumer
+from app.Services.EmailDispatcher import email_dispatcher
+from app.Services.LeaderboardService import leaderboard_service
+from app.Services.ResultService import ResultService
 
 jwt = JWTManager()
 
-def create_app():
+def add_missing_columns():
+    #create_all ne dodaje nove kolone na tabele koje vec postoje; dodaju se kao NULL kolone
+    inspector = inspect(db.engine)
+    quote = db.engine.dialect.identifier_preparer.quote
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                print(f"Column {table.name}.{column.name} is NOT NULL and must be added by a migration")
+                continue
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            try:
+                with db.engine.begin() as conn:
+                    conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type} NULL"))
+                print(f"Added column {table.name}.{column.name}")
+            except DBAPIError as e:
+                #druga instanca je istovremeno dodala istu kolonu
+                if column.name not in {c["name"] for c in inspect(db.engine).get_columns(table.name)}:
+                    raise
+                print(f"Column {table.name}.{column.name} already added: {e.orig}")
+
+def create_missing_indexes():
+    #create_all ne dodaje nove indekse na tabele koje vec postoje
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        indexes = inspector.get_indexes(table.name)
+        existing = {ix["name"] for ix in indexes}
+        #unique kljuc napravljen ranije (npr. unique=True na koloni) pokriva isti unique indeks
+        unique_columns = {tuple(ix["column_names"]) for ix in indexes if ix["unique"]}
+        unique_columns |= {tuple(uc["column_names"]) for uc in inspector.get_unique_constraints(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            if index.unique and tuple(column.name for column in index.columns) in unique_columns:
+                continue
+            index.create(bind=db.engine)
+
+def create_app(start_background_jobs=True):
     from dotenv import load_dotenv
     load_dotenv()
 
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.json = FastJSONProvider(app)
 
-    CORS(app)
+    CORS(app, expose_headers=["X-Next-Cursor", "Content-Disposition"])
     jwt.init_app(app)
-    bcrypt.init_app(app)
     db.init_app(app)
 
     socketio.init_app(app, cors_allowed_origins="*", async_mode='threading')
 
     with app.app_context():
         db.create_all()
+        add_missing_columns()
+        create_missing_indexes()
 
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
     app.register_blueprint(user_bp, url_prefix="/api/users")
     app.register_blueprint(db_test_bp, url_prefix="/api/db")
     app.register_blueprint(quiz_proxy_bp, url_prefix="/api/quizzes")
 
+    if start_background_jobs:
+        result_stream_consumer.start(app)
+        email_dispatcher.start(app)
+
+    #flask --app main rebuild-leaderboards [--quiz-id ID]
+    @app.cli.command("rebuild-leaderboards")
+    @click.option("--quiz-id", default=None, help="Rebuild a single quiz instead of all")
+    def rebuild_leaderboards(quiz_id):
+        processed = leaderboard_service.rebuild(quiz_id)
+        print(f"Leaderboards rebuilt from {processed} result(s)")
+
+    #flask --app main rebuild-result-stats
+    @app.cli.command("rebuild-result-stats")
+    def rebuild_result_stats():
+        print(f"Rebuilt {ResultService().rebuild_stats()} user/quiz stats row(s)")
+
     @app.get("/")
     def home():
         return {"status": "ok", "service": "drs server"}
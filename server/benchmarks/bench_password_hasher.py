@@ -0,0 +1,49 @@
+"""
+Broj provjera lozinki (login) u sekundi: bcrypt u niti zahtjeva (staro
+ponasanje) naspram PasswordHasher pool-a procesa, uz vise istovremenih
+"zahtjeva" (niti). Ispisuje i logins/s po jezgru (po worker procesu).
+
+Pokretanje iz server direktorijuma:
+    python -m benchmarks.bench_password_hasher --rounds 12 --logins 200 --threads 16
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.Extensions.password_hasher import PasswordHasher
+
+
+def measure(hasher: PasswordHasher, password_hash: str, logins: int, threads: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda _: hasher.verify("lozinka123", password_hash), range(logins)))
+    elapsed = time.perf_counter() - start
+    assert all(results)
+    return logins / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    inline = PasswordHasher(workers=0, rounds=args.rounds)
+    password_hash = inline.hash("lozinka123")
+
+    pooled = PasswordHasher(workers=args.workers, rounds=args.rounds, max_pending=args.threads, wait_seconds=60)
+    pooled.verify("lozinka123", password_hash)  #podizanje procesa nije dio mjerenja
+
+    print(f"bcrypt cost {args.rounds}, {args.logins} logins, {args.threads} threads")
+    rate = measure(inline, password_hash, args.logins, args.threads)
+    print(f"inline (request thread)    {rate:8.1f} logins/s")
+    rate = measure(pooled, password_hash, args.logins, args.threads)
+    print(f"pool ({args.workers} worker(s))         {rate:8.1f} logins/s  {rate / args.workers:8.1f} per core")
+
+    pooled.shutdown()
+
+
+if __name__ == "__main__":
+    main()
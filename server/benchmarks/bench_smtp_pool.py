@@ -0,0 +1,86 @@
+"""
+Poredjenje slanja mejlova sa novom SMTP sesijom za svaku poruku (staro
+ponasanje EmailSender-a) i preko SmtpConnectionPool-a.
+
+Po defaultu podize lokalni aiosmtpd server (pip install aiosmtpd), pa se
+mjeri samo cijena SMTP protokola bez STARTTLS-a. Za mjerenje nad pravim
+serverom zadati --host/--port/--user/--password/--starttls.
+
+Pokretanje iz server direktorijuma:
+    python -m benchmarks.bench_smtp_pool --messages 500
+"""
+import argparse
+import smtplib
+import time
+from email.mime.text import MIMEText
+from app.Extensions.smtp_pool import SmtpConnectionPool
+
+
+def make_messages(count: int) -> list:
+    messages = []
+    for i in range(count):
+        msg = MIMEText(f"<p>Benchmark poruka {i}</p>", "html")
+        msg["Subject"] = f"Benchmark {i}"
+        msg["From"] = "bench@example.com"
+        msg["To"] = "player@example.com"
+        messages.append(msg)
+    return messages
+
+
+def send_without_pool(args, messages):
+    for msg in messages:
+        with smtplib.SMTP(args.host, args.port) as server:
+            if args.starttls:
+                server.starttls()
+            if args.user:
+                server.login(args.user, args.password)
+            server.send_message(msg)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--user", default=None)
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--starttls", action="store_true")
+    args = parser.parse_args()
+
+    controller = None
+    if args.host is None:
+        from aiosmtpd.controller import Controller
+        from aiosmtpd.handlers import Sink
+        args.host = "127.0.0.1"
+        controller = Controller(Sink(), hostname=args.host, port=args.port)
+        controller.start()
+
+    try:
+        messages = make_messages(args.messages)
+        pool = SmtpConnectionPool(args.host, args.port, args.user, args.password, use_tls=args.starttls)
+
+        start = time.perf_counter()
+        send_without_pool(args, messages)
+        before = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for msg in messages:
+            pool.send(msg)
+        pooled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pool.send_many(messages)
+        batched = time.perf_counter() - start
+        pool.close_all()
+    finally:
+        if controller is not None:
+            controller.stop()
+
+    print(f"{args.messages} messages to {args.host}:{args.port}")
+    print(f"session per message: {args.messages / before:10.0f} msg/s")
+    print(f"pooled session:      {args.messages / pooled:10.0f} msg/s")
+    print(f"send_many:           {args.messages / batched:10.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,16 @@
-from app import create_app
-from app.Extensions.socketio_ext import socketio
+import os
+import multiprocessing
 
-app = create_app()
+#procesi pool-a za lozinke (spawn) ponovo ucitavaju ovaj modul kao __mp_main__, njima aplikacija ne treba
+if multiprocessing.parent_process() is None:
+    from app import create_app as create_server_app
+    from app.Extensions.socketio_ext import socketio
+
+    #flask --app main <komanda> trazi create_app; CLI komande ne podizu consumer ni email dispatcher
+    def create_app():
+        return create_server_app(start_background_jobs=False)
 
 if __name__ == "__main__":
-    socketio.run(app, host="0.0.0.0", debug=True, port=5000, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    #werkzeug reloader pokrece dva procesa, pozadinske poslove dizemo samo u onom koji servira zahtjeve
+    app = create_server_app(start_background_jobs=os.environ.get("WERKZEUG_RUN_MAIN") == "true")
+    socketio.run(app, host="0.0.0.0", debug=True, port=5000, allow_unsafe_werkzeug=True)